@@ -1,12 +1,17 @@
 import time
 import subprocess
 import os
+import sys
 import logging
 import requests
 import json
 import pandas as pd
 import glob
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from ic_sidecar_proxy import SidecarProxy
 from pathlib import Path
 
 ##########################################################################################
@@ -17,15 +22,18 @@ current_path = Path(__file__)
 current_folder_path = f"{current_path.parent.parent}"
 current_folder_path = current_folder_path.replace("\\", "/")
 
+# Folder with .env_dev / .env_qa, e.g. CI_CD_ENV_FOLDER=app/debug_utils/stand_in_env for the local IICS stand-in server
+env_folder = os.getenv("CI_CD_ENV_FOLDER", f"{current_folder_path}/env")
+
 #ENV for Export
-env_path = Path(f'{current_folder_path}/env/.env_dev')
+env_path = Path(f'{env_folder}/.env_dev')
 load_dotenv(dotenv_path=env_path)
 EX_IC_USERNAME = os.getenv("DEV_IC_USERNAME")
 EX_IC_PASSWORD = os.getenv("DEV_IC_PASSWORD")
 EX_IC_LOGIN_URL = os.getenv("DEV_IC_LOGIN_URL")
 
 #ENV for Import
-env_path = Path(f'{current_folder_path}/env/.env_qa')
+env_path = Path(f'{env_folder}/.env_qa')
 load_dotenv(dotenv_path=env_path)
 IM_IC_USERNAME = os.getenv("QA_IC_USERNAME")
 IM_IC_PASSWORD = os.getenv("QA_IC_PASSWORD")
@@ -37,6 +45,8 @@ print(f"CI_CD_SESSION_ID: {CI_CD_SESSION_ID}")
 CI_CD_DIRECTION = "dev_to_qa"
 MAIN_CI_CD_TASK_FOLDER = f"{current_folder_path}/ci_cd_task/{CI_CD_DIRECTION}"
 IMPORT_CONFLICT_RESOLUTION = "OVERWRITE"
+# Objects (export batches) of a module processed in parallel, e.g. CI_CD_CONCURRENCY=8 (1 - one after another)
+CI_CD_CONCURRENCY = int(os.getenv("CI_CD_CONCURRENCY") or 1)
 MAIN_ORCHESTARTOR_MODULE_NAME = "MAIN_ORCHESTRATOR"
 
 MODULE_FOLDER = f"{current_folder_path}/module"
@@ -45,6 +55,29 @@ print(f"MODULE_FOLDER: {MODULE_FOLDER}")
 LOG_MODULE_FOLDER = f"{current_folder_path}/log/module"
 LOG_CI_CD_SESSION_FOLDER = f"{current_folder_path}/log/log_ci_cd_session"
 
+# Session token cache: IICS session expires after 30 min without activity,
+# token is renewed in background TOKEN_REFRESH_BEFORE_SEC before it expires
+TOKEN_CACHE_FOLDER = f"{current_folder_path}/token_cache"
+TOKEN_TTL_SEC = 30 * 60
+TOKEN_REFRESH_BEFORE_SEC = 5 * 60
+TOKEN_REFRESH_CHECK_SEC = 30
+
+# Local sidecar proxy: module processes call IICS through warm pooled connections of the orchestrator
+SIDECAR_PROXY = False
+SIDECAR_POOL_MAXSIZE = 20
+SIDECAR_WARM_CONNECTIONS = 4
+SIDECAR_KEEP_WARM_SEC = 60
+
+# Record / replay of all IICS REST traffic of the session (module/CDI_CAI/app/ic_cassette.py):
+# CI_CD_HTTP_CASSETTE_MODE=record - every process writes <CI_CD_HTTP_CASSETTE_FOLDER>/<module_name>.jsonl
+# CI_CD_HTTP_CASSETTE_MODE=replay CI_CD_HTTP_CASSETTE_FOLDER=<recorded folder> [CI_CD_HTTP_CASSETTE_SPEED=2] - offline run
+HTTP_CASSETTE_MODE = os.getenv("CI_CD_HTTP_CASSETTE_MODE", "")
+HTTP_CASSETTE_FOLDER = os.getenv("CI_CD_HTTP_CASSETTE_FOLDER") or f"{current_folder_path}/log/http_cassette/{CI_CD_SESSION_ID}"
+HTTP_CASSETTE_SPEED = float(os.getenv("CI_CD_HTTP_CASSETTE_SPEED") or 1.0)
+if HTTP_CASSETTE_MODE == "replay":
+    # Replayed session ids are not real, they must not get into the token cache of real runs
+    TOKEN_CACHE_FOLDER = f"{HTTP_CASSETTE_FOLDER}/token_cache_replay"
+
 ##### set up logging #####
 class SafeExtraFormatter(logging.Formatter):
     def format(self, record):
@@ -79,6 +112,16 @@ str_module_name_value = f"[module: {MAIN_ORCHESTARTOR_MODULE_NAME}]"
 extra_log_param = {'module_name': str_module_name_value}
 adapterLogger = logging.LoggerAdapter(rootLogger, extra_log_param)
 
+# Keep-alive connections for logins (Export and Import env, background token refresh)
+auth_http_session = requests.Session()
+
+http_cassette = None
+if HTTP_CASSETTE_MODE:
+    sys.path.append(f"{MODULE_FOLDER}/CDI_CAI/app")
+    from ic_cassette import HttpCassette
+    http_cassette = HttpCassette(HTTP_CASSETTE_MODE, f"{HTTP_CASSETTE_FOLDER}/{MAIN_ORCHESTARTOR_MODULE_NAME}.jsonl", HTTP_CASSETTE_SPEED)
+    auth_http_session = http_cassette.create_session("LOGIN", "", auth_http_session)
+
 
 ########################################################################################
 def ic_authentication(login_url: str, login: str, password: str):
@@ -89,23 +132,84 @@ def ic_authentication(login_url: str, login: str, password: str):
     }
     ic_server_url = ""
     ic_session_id = ""
-    auth_response = requests.post(login_url, json=auth_payload)
+    ic_org_id = ""
+    auth_response = auth_http_session.post(login_url, json=auth_payload)
     if auth_response.status_code == 200:
         response_data = json.loads(auth_response.content)
         ic_server_url = response_data['serverUrl']
         ic_session_id = response_data['icSessionId']
+        ic_org_id = response_data.get('orgId', "")
         rootLogger.info("Authentication successful")
     else:
         rootLogger.info(f"status_code: {auth_response.status_code}")
         rootLogger.info(auth_response.text)
         raise Exception("Authentication denied!")
-    return (auth_response.status_code, ic_server_url, ic_session_id)
+    return (auth_response.status_code, ic_server_url, ic_session_id, ic_org_id)
+
+
+def get_token_cache_path(login_url: str, login: str):
+    token_cache_key = hashlib.sha256(f"{login_url}|{login}".encode("utf-8")).hexdigest()[:32]
+    return f"{TOKEN_CACHE_FOLDER}/{token_cache_key}.json"
+
+
+def load_token_cache(token_cache_path: str):
+    if not os.path.exists(token_cache_path):
+        return None
+    try:
+        with open(token_cache_path, mode='r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_token_cache(token_cache_path: str, token: dict):
+    os.makedirs(TOKEN_CACHE_FOLDER, exist_ok=True)
+    tmp_path = f"{token_cache_path}.tmp"
+    with open(tmp_path, mode='w', encoding='utf-8') as f:
+        json.dump(token, f)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, token_cache_path)
+
+
+def ic_authentication_cached(login_url: str, login: str, password: str, force_login: bool = False):
+    # Takes session from the token cache (keyed by login url and user) while it is not close to expiry,
+    # otherwise logs in and saves the new session in the cache.
+    # Modules read the same cache file, so they pick up a renewed session without restart
+    token_cache_path = get_token_cache_path(login_url, login)
+    token = None if force_login else load_token_cache(token_cache_path)
+    if token is not None and token.get("expires_at", 0) - TOKEN_REFRESH_BEFORE_SEC > time.time():
+        rootLogger.info(f"Session taken from token cache (expires in {int(token['expires_at'] - time.time())} sec)")
+        return (200, token["server_url"], token["session_id"], token["org_id"], token_cache_path)
+
+    login_time = time.time()
+    auth_response_code, ic_server_url, ic_session_id, ic_org_id = ic_authentication(login_url, login, password)
+    token = {
+        "server_url": ic_server_url,
+        "session_id": ic_session_id,
+        "org_id": ic_org_id,
+        "login_time": login_time,
+        "expires_at": login_time + TOKEN_TTL_SEC
+    }
+    save_token_cache(token_cache_path, token)
+    return (auth_response_code, ic_server_url, ic_session_id, ic_org_id, token_cache_path)
 
 
-def create_ci_cd_task_file(source_ci_cd_task_path: str, target_ci_cd_task_path: str, module_name: str, target_ci_cd_task_file: str):
+def refresh_tokens(list_credentials: list, stop_event: threading.Event):
+    # Background loop: renews every session from list_credentials before it expires
+    while not stop_event.wait(TOKEN_REFRESH_CHECK_SEC):
+        for login_url, login, password in list_credentials:
+            token = load_token_cache(get_token_cache_path(login_url, login))
+            if token is not None and token.get("expires_at", 0) - TOKEN_REFRESH_BEFORE_SEC > time.time():
+                continue
+            try:
+                ic_authentication_cached(login_url, login, password, force_login=True)
+                rootLogger.info(f"Session refreshed for {login_url}")
+            except Exception as e:
+                rootLogger.error(f"Session refresh failed for {login_url}: {e}")
+
+
+def get_main_ci_cd_task_file(source_ci_cd_task_path: str):
     input_dir = source_ci_cd_task_path
-    output_dir = target_ci_cd_task_path
-    sheet_module = module_name 
 
     # Looking for Excel-file (.xls, .xlsx)
     file_pattern = os.path.join(input_dir, "*.xls*")
@@ -116,6 +220,24 @@ def create_ci_cd_task_file(source_ci_cd_task_path: str, target_ci_cd_task_path:
 
     input_file = matching_files[0]
     adapterLogger.info(f"[V] Main cid_cd file found: {input_file}")
+    return input_file
+
+
+def read_ci_cd_task_sheets(source_ci_cd_task_path: str, list_module_name: list):
+    # Reads sheets of all modules from the main ci_cd task file at once
+    input_file = get_main_ci_cd_task_file(source_ci_cd_task_path)
+    try:
+        map_sheet_df = pd.read_excel(input_file, sheet_name=list_module_name)
+    except ValueError as e:
+        raise ValueError(f"Sheets {list_module_name} not found if file '{input_file}'") from e
+    return map_sheet_df
+
+
+def create_ci_cd_task_file(source_ci_cd_task_path: str, target_ci_cd_task_path: str, module_name: str, target_ci_cd_task_file: str,
+                           df: pd.DataFrame = None):
+    # df - sheet already read by read_ci_cd_task_sheets, otherwise the sheet is read from the main ci_cd task file
+    output_dir = target_ci_cd_task_path
+    sheet_module = module_name 
 
     # Create folder for module ci_cd task 
     if not os.path.exists(output_dir):
@@ -127,10 +249,12 @@ def create_ci_cd_task_file(source_ci_cd_task_path: str, target_ci_cd_task_path:
         adapterLogger.info(f"Folder '{output_dir}' cleaned")
 
     # Read Sheet with objects list:
-    try:
-        df = pd.read_excel(input_file, sheet_name=sheet_module)
-    except ValueError as e:
-        raise ValueError(f"Sheet '{sheet_module}' not found if file '{input_file}'") from e
+    if df is None:
+        input_file = get_main_ci_cd_task_file(source_ci_cd_task_path)
+        try:
+            df = pd.read_excel(input_file, sheet_name=sheet_module)
+        except ValueError as e:
+            raise ValueError(f"Sheet '{sheet_module}' not found if file '{input_file}'") from e
 
     # Create ci_cd task file for module:
     output_file = os.path.join(output_dir, target_ci_cd_task_file)
@@ -146,32 +270,80 @@ if __name__ == "__main__":
 
     adapterLogger.info(f"\n========= START | CI_CD_SESSION_ID: {CI_CD_SESSION_ID} | CI_CD_DIRECTION: {CI_CD_DIRECTION} ========= ")
 
+    # Excel tabs names in correct order
+    ci_cd_module_order = ['R360', 'CDI', 'CAI', 'CDQ']
+
     # ========= Authorization =========
-    adapterLogger.info("\n========= Authorization in Export env ========= ")
-    auth_response_code, ex_ic_server_url, ex_ic_session_id = ic_authentication(EX_IC_LOGIN_URL, EX_IC_USERNAME, EX_IC_PASSWORD)
+    # Logins in Export and Import env run in parallel with reading of the main ci_cd task file
+    adapterLogger.info("\n========= Authorization in Export and Import env ========= ")
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="auth") as executor:
+        # With a cassette the token cache is bypassed at start: record always has the login exchange, replay always plays it
+        force_login = bool(HTTP_CASSETTE_MODE)
+        ex_auth_future = executor.submit(ic_authentication_cached, EX_IC_LOGIN_URL, EX_IC_USERNAME, EX_IC_PASSWORD, force_login)
+        im_auth_future = executor.submit(ic_authentication_cached, IM_IC_LOGIN_URL, IM_IC_USERNAME, IM_IC_PASSWORD, force_login)
+
+        adapterLogger.info("\n========= Read main ci_cd task file ========= ")
+        try:
+            map_module_ci_cd_task_df = read_ci_cd_task_sheets(MAIN_CI_CD_TASK_FOLDER, ci_cd_module_order)
+        except Exception as e:
+            adapterLogger.error(e)
+            raise Exception(e)
+
+        auth_response_code, ex_ic_server_url, ex_ic_session_id, ex_ic_org_id, ex_ic_token_cache_path = ex_auth_future.result()
+        auth_response_code, im_ic_server_url, im_ic_session_id, im_ic_org_id, im_ic_token_cache_path = im_auth_future.result()
+
     adapterLogger.info(f"ex_ic_server_url: {ex_ic_server_url}")
     adapterLogger.info(f"ex_ic_session_id: {ex_ic_session_id}")
-
-    adapterLogger.info("\n========= Authorization in Import env ========= ")
-    auth_response_code, im_ic_server_url, im_ic_session_id = ic_authentication(IM_IC_LOGIN_URL, IM_IC_USERNAME, IM_IC_PASSWORD)
+    adapterLogger.info(f"ex_ic_org_id: {ex_ic_org_id}")
     adapterLogger.info(f"im_ic_server_url: {im_ic_server_url}")
     adapterLogger.info(f"im_ic_session_id: {im_ic_session_id}")
+    adapterLogger.info(f"im_ic_org_id: {im_ic_org_id}")
+
+    # Renew sessions in background while modules are running
+    token_refresh_stop_event = threading.Event()
+    token_refresh_thread = threading.Thread(
+        target=refresh_tokens,
+        args=([(EX_IC_LOGIN_URL, EX_IC_USERNAME, EX_IC_PASSWORD), (IM_IC_LOGIN_URL, IM_IC_USERNAME, IM_IC_PASSWORD)], token_refresh_stop_event),
+        name="token_refresh",
+        daemon=True
+    )
+    token_refresh_thread.start()
+
+    sidecar_proxy = None
+    ex_ic_sidecar_url = ""
+    im_ic_sidecar_url = ""
+    if SIDECAR_PROXY:
+        sidecar_proxy = SidecarProxy([ex_ic_server_url, im_ic_server_url], SIDECAR_POOL_MAXSIZE, SIDECAR_WARM_CONNECTIONS, SIDECAR_KEEP_WARM_SEC)
+        sidecar_proxy.start()
+        ex_ic_sidecar_url = sidecar_proxy.get_url(ex_ic_server_url)
+        im_ic_sidecar_url = sidecar_proxy.get_url(im_ic_server_url)
+        adapterLogger.info(f"ex_ic_sidecar_url: {ex_ic_sidecar_url} | im_ic_sidecar_url: {im_ic_sidecar_url}")
 
     # ========= Prepare CI_CD mappings =========
     adapterLogger.info(f"\n========= Prepare CI_CD mappings ========= ")
     params_collection = {
         "ex_ic_server_url": ex_ic_server_url,
         "ex_ic_session_id": ex_ic_session_id,
+        "ex_ic_org_id": ex_ic_org_id,
+        "ex_ic_token_cache_path": ex_ic_token_cache_path,
+        "ex_ic_sidecar_url": ex_ic_sidecar_url,
         "im_ic_server_url": im_ic_server_url,
         "im_ic_session_id": im_ic_session_id,
+        "im_ic_org_id": im_ic_org_id,
+        "im_ic_token_cache_path": im_ic_token_cache_path,
+        "im_ic_sidecar_url": im_ic_sidecar_url,
         "module_folder": MODULE_FOLDER,
         "module_name": "",
         "ci_cd_session_id": CI_CD_SESSION_ID,
         "ci_cd_direction": CI_CD_DIRECTION,
         "import_conflict_resolution": IMPORT_CONFLICT_RESOLUTION,
+        "concurrency": CI_CD_CONCURRENCY,
         "log_module_foler": LOG_MODULE_FOLDER,
         "log_ci_cd_session_folder": LOG_CI_CD_SESSION_FOLDER,
-        "log_ci_cd_session_file_path": LOG_CI_CD_SESSION_FILE_PATH
+        "log_ci_cd_session_file_path": LOG_CI_CD_SESSION_FILE_PATH,
+        "http_cassette_mode": HTTP_CASSETTE_MODE,
+        "http_cassette_folder": HTTP_CASSETTE_FOLDER,
+        "http_cassette_speed": HTTP_CASSETTE_SPEED
     }
 
     map_module_path = {
@@ -181,9 +353,6 @@ if __name__ == "__main__":
         "CDQ": f"{MODULE_FOLDER}/CDQ/app/main.py"
     }
 
-    # Excel tabs names in correct order
-    ci_cd_module_order = ['R360', 'CDI', 'CAI', 'CDQ']
-
     # ========= Start CI_CD process =========
     adapterLogger.info(f"\n ========= Start CI_CD process ========= ")
     for module_name in ci_cd_module_order:
@@ -195,7 +364,8 @@ if __name__ == "__main__":
         module_ci_cd_task_path = f"{MODULE_FOLDER}/{module_name_path}/ci_cd_task/{CI_CD_DIRECTION}"
         module_ci_cd_task_file_name = f"{module_name}-{CI_CD_SESSION_ID}.csv"
         try:
-            result = create_ci_cd_task_file(MAIN_CI_CD_TASK_FOLDER, module_ci_cd_task_path, module_name, module_ci_cd_task_file_name)
+            result = create_ci_cd_task_file(MAIN_CI_CD_TASK_FOLDER, module_ci_cd_task_path, module_name, module_ci_cd_task_file_name,
+                                            map_module_ci_cd_task_df.get(module_name))
         except Exception as e:
             adapterLogger.error(e)
             raise Exception(e)
@@ -203,6 +373,11 @@ if __name__ == "__main__":
         module_path = map_module_path.get(module_name)
 
         params_collection["module_name"] = module_name
+        # Sessions could be renewed by token_refresh while previous modules were running
+        for env_prefix, token_cache_path in (("ex", ex_ic_token_cache_path), ("im", im_ic_token_cache_path)):
+            token = load_token_cache(token_cache_path)
+            if token is not None:
+                params_collection[f"{env_prefix}_ic_session_id"] = token["session_id"]
         str_params_collection = json.dumps(params_collection)
 
         adapterLogger.info(f"\n ========= Start run module: {module_name} ========= ")
@@ -214,6 +389,12 @@ if __name__ == "__main__":
             raise Exception(e)
         adapterLogger.info(f"\n ========= Finish run module: {module_name} ========= ")
 
+    token_refresh_stop_event.set()
+    if sidecar_proxy is not None:
+        sidecar_proxy.stop()
+    if http_cassette is not None:
+        http_cassette.close()
+        adapterLogger.info(f"HTTP cassette: {http_cassette.get_stats()} | folder: {HTTP_CASSETTE_FOLDER}")
     adapterLogger.info(f"\n ========= FINISH | CI_CD_SESSION_ID: {CI_CD_SESSION_ID} | CI_CD_DIRECTION: {CI_CD_DIRECTION} ========= ")
 
 
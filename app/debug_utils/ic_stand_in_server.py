@@ -0,0 +1,576 @@
+import io
+import re
+import csv
+import sys
+import gzip
+import json
+import math
+import time
+import uuid
+import random
+import zipfile
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# Local stand-in of the IICS REST API for offline end-to-end runs and benchmarks.
+# Endpoints used by the project:
+#   POST /ma/api/v2/user/login
+#   GET  <serverUrl>/public/core/v3/objects?q=type=='..' [and location=='..'] [and updateTime>'..']&limit=&skip=
+#   POST <serverUrl>/public/core/v3/export            GET <serverUrl>/public/core/v3/export/{id}[?expand=objects]
+#   GET  <serverUrl>/public/core/v3/export/{id}/package (Range supported)   GET <serverUrl>/public/core/v3/export/{id}/log
+#   POST <serverUrl>/public/core/v3/import/package    POST/GET <serverUrl>/public/core/v3/import/{id}[?expand=objects]
+#   GET  <serverUrl>/public/core/v3/import/{id}/log
+#   GET  /stand-in/stats - counters of the stand-in itself
+# Every login user gets an org of its own (serverUrl = http://<host>:<port>/<org_id>/saas),
+# imported objects are added to the catalog of the import org.
+# Job durations, package size, error rate and rate limits are set in the JSON config (see DEFAULT_CONFIG).
+#
+# Usage:
+#   python app/debug_utils/ic_stand_in_server.py [--config stand_in.json] [--port 8765]
+#   CI_CD_ENV_FOLDER=app/debug_utils/stand_in_env python app/ci_cd_orchestrator.py
+
+DEFAULT_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    # null - any password is accepted
+    "password": None,
+    "session_ttl_sec": 30 * 60,
+    # delay of every REST response
+    "response_delay_sec": 0.0,
+    # job duration is random between min and max
+    "export_job_sec": [2.0, 5.0],
+    "import_job_sec": [3.0, 8.0],
+    "package_size_bytes": 256 * 1024,
+    # share of REST calls answered with one of error_status_codes (login is never failed)
+    "error_rate": 0.0,
+    "error_status_codes": [500, 502, 503, 504],
+    # share of jobs (export) / objects (import) that end FAILED
+    "job_failure_rate": 0.0,
+    # token bucket per org, 0 - no limit; over the limit: 429 with Retry-After
+    "rate_limit_per_sec": 0.0,
+    "rate_limit_burst": 10,
+    # JSON and text bodies bigger than compression_min_bytes are sent with gzip if the client accepts it
+    "compression": True,
+    "compression_min_bytes": 1024,
+    # generated catalog of every org: types x folders x objects per folder
+    "catalog_types": ["Mapping", "MTT", "TASKFLOW", "AI_SERVICE_CONNECTOR", "PROCESS", "AI_CONNECTION"],
+    "catalog_n_folders": 5,
+    "catalog_n_objects_per_folder": 20,
+    # ci_cd task CSV files (columns: Sr. No, Type, Folder, Asset Name), their objects are added to every catalog
+    "seed_csv": [],
+    "verbose": False
+}
+
+API_PREFIX = "/public/core/v3"
+PACKAGE_METADATA_FILE = "exportMetadata.v2.json"
+# Type labels of ci_cd task CSV files -> object types of the REST API (as queried by the modules), other labels are kept
+SEED_TYPE_BY_LABEL = {
+    "mapping": "Mapping",
+    "mapping task": "MTT",
+    "mtt": "MTT",
+    "taskflow": "TASKFLOW",
+    "service connector": "AI_SERVICE_CONNECTOR",
+    "process": "PROCESS",
+    "app connector": "AI_CONNECTION",
+    "app connection": "AI_CONNECTION"
+}
+
+
+def get_iso_time(timestamp: float):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def get_object_id(org_key: str, path: str, type: str):
+    # Same id for the same object in every run (and in every org - as objects promoted with IICS export/import)
+    return hashlib.sha256(f"{org_key}|{type}|{path}".encode("utf-8")).hexdigest()[:22]
+
+
+# ORG STATE ##############################################################################
+
+class StandInOrg:
+
+    def __init__(self, org_id: str, config: dict, list_seed_object: list):
+        self.org_id = org_id
+        self.config = config
+        self.lock = threading.Lock()
+        self.map_object = dict()
+        self.map_export_job = dict()
+        self.map_import_job = dict()
+        self.tokens = float(config["rate_limit_burst"])
+        self.last_refill = time.monotonic()
+
+        create_time = time.time() - 30 * 24 * 60 * 60
+        for type in config["catalog_types"]:
+            for i_folder in range(1, config["catalog_n_folders"] + 1):
+                location = f"Project_{i_folder}/Folder_{i_folder}"
+                for i_object in range(1, config["catalog_n_objects_per_folder"] + 1):
+                    self.add_object(f"{location}/{type.lower()}_{i_object:04d}", type, create_time)
+        for path, type in list_seed_object:
+            self.add_object(path, type, create_time)
+
+    def add_object(self, path: str, type: str, update_time: float, object_id: str = None):
+        object_id = object_id or get_object_id("stand_in", path, type)
+        location, _, name = path.rpartition("/")
+        self.map_object[object_id] = {
+            "id": object_id,
+            "path": path,
+            "type": type,
+            "description": "",
+            "updateTime": get_iso_time(update_time),
+            "location": location,
+            "name": name
+        }
+        return self.map_object[object_id]
+
+    def take_rate_limit_token(self):
+        # Returns 0 or seconds to wait (Retry-After)
+        rate_per_sec = self.config["rate_limit_per_sec"]
+        if not rate_per_sec:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.config["rate_limit_burst"], self.tokens + (now - self.last_refill) * rate_per_sec)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / rate_per_sec
+
+    def find_objects(self, query: str):
+        # Subset of IICS q syntax: type=='..' and location=='..' and updateTime>'..'
+        list_condition = re.findall(r"(\w+)\s*(==|>|<)\s*'([^']*)'", query)
+        list_found = []
+        with self.lock:
+            list_object = list(self.map_object.values())
+        for obj in list_object:
+            for field, operator, value in list_condition:
+                field_value = obj.get(field, "")
+                if field == "location":
+                    field_value, value = field_value.lower(), value.lower()
+                if ((operator == "==" and field_value != value) or (operator == ">" and not field_value > value)
+                        or (operator == "<" and not field_value < value)):
+                    break
+            else:
+                list_found.append(obj)
+        list_found.sort(key=lambda obj: obj["path"])
+        return list_found
+
+
+def get_job_state(job: dict):
+    # QUEUED -> IN_PROGRESS -> SUCCESSFUL / FAILED by elapsed time
+    elapsed_sec = time.time() - job["start_time"]
+    if elapsed_sec < job["duration_sec"] * 0.1:
+        return "QUEUED"
+    if elapsed_sec < job["duration_sec"]:
+        return "IN_PROGRESS"
+    return job["final_state"]
+
+
+def build_package(job: dict, package_size_bytes: int):
+    # Zip with the export metadata and an incompressible filler up to package_size_bytes, the same bytes for every call
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as package:
+        metadata = {"exportedObjects": [{"objectGuid": obj["id"], "objectName": obj["name"], "objectType": obj["type"],
+                                         "path": obj["path"]} for obj in job["objects"]]}
+        package.writestr(PACKAGE_METADATA_FILE, json.dumps(metadata, indent=2))
+        filler_size = max(package_size_bytes - buffer.tell() - 200, 0)
+        package.writestr("Explore/content.bin", random.Random(job["id"]).randbytes(filler_size))
+    return buffer.getvalue()
+
+#########################################################################################
+
+
+# HTTP HANDLER ###########################################################################
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: dict):
+        super().__init__((config["host"], config["port"]), StandInHandler)
+        self.config = config
+        self.lock = threading.Lock()
+        self.map_org = dict()
+        self.map_session = dict()
+        self.map_stats = dict()
+        self.list_seed_object = read_seed_objects(config["seed_csv"])
+
+    def get_server_url(self, org_id: str):
+        return f"http://{self.config['host']}:{self.server_address[1]}/{org_id}/saas"
+
+    def get_org(self, username: str):
+        org_id = "org_" + hashlib.sha256(username.encode("utf-8")).hexdigest()[:10]
+        with self.lock:
+            if org_id not in self.map_org:
+                self.map_org[org_id] = StandInOrg(org_id, self.config, self.list_seed_object)
+            return self.map_org[org_id]
+
+    def add_stat(self, name: str):
+        with self.lock:
+            self.map_stats[name] = self.map_stats.get(name, 0) + 1
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # --- response helpers ---
+    def send_body(self, status_code: int, body: bytes, content_type: str = "application/json", headers: dict = None):
+        config = self.server.config
+        if (config["compression"] and len(body) >= config["compression_min_bytes"] and content_type.startswith(("application/json", "text/"))
+                and "gzip" in self.headers.get("Accept-Encoding", "")):
+            body = gzip.compress(body, compresslevel=6)
+            headers = {**(headers or {}), "Content-Encoding": "gzip"}
+        self.send_response(status_code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for header_name, header_value in (headers or {}).items():
+            self.send_header(header_name, header_value)
+        self.end_headers()
+        if self.command != "HEAD":
+            for position in range(0, len(body), 1024 * 1024):
+                self.wfile.write(body[position:position + 1024 * 1024])
+
+    def send_json(self, status_code: int, data, headers: dict = None):
+        self.send_body(status_code, json.dumps(data).encode("utf-8"), headers=headers)
+
+    def send_error_json(self, status_code: int, message: str, headers: dict = None):
+        self.send_json(status_code, {"error": {"code": f"STAND_IN_{status_code}", "message": message}}, headers)
+
+    def read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                chunk_size = int(self.rfile.readline().split(b";")[0], 16)
+                if chunk_size == 0:
+                    self.rfile.readline()
+                    return body
+                body += self.rfile.read(chunk_size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def read_json(self):
+        try:
+            return json.loads(self.read_body() or b"{}")
+        except ValueError:
+            return None
+
+    def log_message(self, format, *args):
+        if self.server.config["verbose"]:
+            super().log_message(format, *args)
+
+    # --- routing ---
+    def do_HEAD(self):
+        self.send_body(200, b"")
+
+    def do_GET(self):
+        self.route("GET")
+
+    def do_POST(self):
+        self.route("POST")
+
+    def route(self, method: str):
+        url = urlsplit(self.path)
+        map_query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if method == "POST" and url.path == "/ma/api/v2/user/login":
+            return self.login()
+        if method == "GET" and url.path == "/stand-in/stats":
+            with self.server.lock:
+                return self.send_json(200, dict(self.server.map_stats))
+
+        match = re.match(rf"^/([^/]+)/saas{API_PREFIX}(/.*)$", url.path)
+        if match is None:
+            return self.send_error_json(404, f"Unknown path {url.path}")
+        org = self.server.map_org.get(match.group(1))
+        api_path = match.group(2)
+        if method == "POST":
+            # body is read before any error response, the connection stays usable
+            body = self.read_body()
+        if org is None or not self.check_session(org):
+            return self.send_error_json(401, "Invalid session id")
+
+        retry_after_sec = org.take_rate_limit_token()
+        if retry_after_sec > 0:
+            self.server.add_stat("429")
+            return self.send_error_json(429, "Too many requests", {"Retry-After": str(math.ceil(retry_after_sec))})
+        if random.random() < self.server.config["error_rate"]:
+            status_code = random.choice(self.server.config["error_status_codes"])
+            self.server.add_stat(f"injected_{status_code}")
+            return self.send_error_json(status_code, "Injected error of the stand-in server")
+        if self.server.config["response_delay_sec"]:
+            time.sleep(self.server.config["response_delay_sec"])
+
+        list_route = [
+            ("GET", r"^/objects$", self.get_objects),
+            ("POST", r"^/export$", self.create_export_job),
+            ("GET", r"^/export/([^/]+)$", self.get_export_job),
+            ("GET", r"^/export/([^/]+)/package$", self.get_export_package),
+            ("GET", r"^/export/([^/]+)/log$", self.get_export_log),
+            ("POST", r"^/import/package$", self.upload_import_package),
+            ("POST", r"^/import/([^/]+)$", self.start_import_job),
+            ("GET", r"^/import/([^/]+)$", self.get_import_job),
+            ("GET", r"^/import/([^/]+)/log$", self.get_import_log),
+        ]
+        for route_method, route_pattern, route_handler in list_route:
+            route_match = re.match(route_pattern, api_path)
+            if route_method == method and route_match:
+                self.server.add_stat(f"{method} {route_pattern}")
+                args = [org, map_query] + list(route_match.groups())
+                if method == "POST":
+                    args.append(body)
+                return route_handler(*args)
+        self.send_error_json(404, f"Unknown endpoint {method} {api_path}")
+
+    # --- login ---
+    def login(self):
+        payload = self.read_json() or {}
+        username = payload.get("username") or ""
+        password = self.server.config["password"]
+        if not username or (password is not None and payload.get("password") != password):
+            return self.send_error_json(401, "Invalid username or password")
+        org = self.server.get_org(username)
+        session_id = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.map_session[session_id] = {"org_id": org.org_id, "expires_at": time.time() + self.server.config["session_ttl_sec"]}
+        self.server.add_stat("login")
+        self.send_json(200, {"@type": "user", "name": username, "orgId": org.org_id, "icSessionId": session_id,
+                             "serverUrl": self.server.get_server_url(org.org_id)})
+
+    def check_session(self, org: StandInOrg):
+        session_id = self.headers.get("INFA-SESSION-ID", "")
+        with self.server.lock:
+            session = self.server.map_session.get(session_id)
+            if session is None or session["org_id"] != org.org_id or session["expires_at"] < time.time():
+                return False
+            # IICS session expires after session_ttl_sec without activity
+            session["expires_at"] = time.time() + self.server.config["session_ttl_sec"]
+        return True
+
+    # --- objects ---
+    def get_objects(self, org: StandInOrg, map_query: dict):
+        list_found = org.find_objects(map_query.get("q", ""))
+        limit = int(map_query.get("limit", 25))
+        skip = int(map_query.get("skip", 0))
+        list_page = [{key: obj[key] for key in ("id", "path", "type", "description", "updateTime")}
+                     for obj in list_found[skip:skip + limit]]
+        self.send_json(200, {"count": len(list_found), "objects": list_page})
+
+    # --- export ---
+    def create_export_job(self, org: StandInOrg, map_query: dict, body: bytes):
+        try:
+            payload = json.loads(body)
+            list_object_id = [obj["id"] for obj in payload["objects"]]
+        except (ValueError, KeyError, TypeError):
+            return self.send_error_json(400, "Invalid export request")
+        with org.lock:
+            list_unknown_id = [object_id for object_id in list_object_id if object_id not in org.map_object]
+            if list_unknown_id or not list_object_id:
+                return self.send_error_json(400, f"Objects not found: {list_unknown_id}")
+            config = self.server.config
+            job = {
+                "id": uuid.uuid4().hex[:22],
+                "name": payload.get("name", ""),
+                "start_time": time.time(),
+                "duration_sec": random.uniform(*config["export_job_sec"]),
+                "final_state": "FAILED" if random.random() < config["job_failure_rate"] else "SUCCESSFUL",
+                "objects": [dict(org.map_object[object_id]) for object_id in list_object_id],
+                "package": None
+            }
+            org.map_export_job[job["id"]] = job
+        self.send_json(200, self.get_export_job_data(job, False))
+
+    def get_export_job_data(self, job: dict, expand_objects: bool):
+        state = get_job_state(job)
+        data = {"id": job["id"], "name": job["name"], "createTime": get_iso_time(job["start_time"]),
+                "status": {"state": state, "message": f"Export job {state}"}}
+        if expand_objects:
+            data["objects"] = [{"id": obj["id"], "name": obj["name"], "path": obj["path"], "type": obj["type"],
+                                "status": {"state": state, "message": ""}} for obj in job["objects"]]
+        return data
+
+    def get_export_job(self, org: StandInOrg, map_query: dict, export_id: str):
+        job = org.map_export_job.get(export_id)
+        if job is None:
+            return self.send_error_json(404, f"Export job {export_id} not found")
+        self.send_json(200, self.get_export_job_data(job, map_query.get("expand") == "objects"))
+
+    def get_export_package(self, org: StandInOrg, map_query: dict, export_id: str):
+        job = org.map_export_job.get(export_id)
+        if job is None or get_job_state(job) != "SUCCESSFUL":
+            return self.send_error_json(404, f"Package of export job {export_id} is not available")
+        with org.lock:
+            if job["package"] is None:
+                job["package"] = build_package(job, self.server.config["package_size_bytes"])
+        package = job["package"]
+        file_name = f"{job['name'] or export_id}.zip"
+        headers = {"Accept-Ranges": "bytes", "Content-Disposition": f"attachment; filename=\"{file_name}\""}
+
+        range_match = re.match(r"^bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        if range_match is None:
+            return self.send_body(200, package, "application/zip", headers)
+        start = int(range_match.group(1))
+        end = min(int(range_match.group(2) or len(package) - 1), len(package) - 1)
+        if start >= len(package) or start > end:
+            return self.send_body(416, b"", "application/zip", {**headers, "Content-Range": f"bytes */{len(package)}"})
+        self.send_body(206, package[start:end + 1], "application/zip",
+                       {**headers, "Content-Range": f"bytes {start}-{end}/{len(package)}"})
+
+    def get_export_log(self, org: StandInOrg, map_query: dict, export_id: str):
+        job = org.map_export_job.get(export_id)
+        if job is None:
+            return self.send_error_json(404, f"Export job {export_id} not found")
+        list_line = [f"{get_iso_time(job['start_time'])} Export job '{job['name']}' ({export_id}) {get_job_state(job)}"]
+        list_line += [f"  {obj['type']} {obj['path']} ({obj['id']})" for obj in job["objects"]]
+        self.send_body(200, "\n".join(list_line).encode("utf-8"), "text/plain")
+
+    # --- import ---
+    def upload_import_package(self, org: StandInOrg, map_query: dict, body: bytes):
+        boundary_match = re.search(r"boundary=([^;]+)", self.headers.get("Content-Type", ""))
+        try:
+            part = next(part for part in body.split(b"--" + boundary_match.group(1).strip('"').encode("utf-8"))
+                        if b"filename=" in part.split(b"\r\n\r\n", 1)[0])
+            package_bytes = part.split(b"\r\n\r\n", 1)[1][:-2]
+            with zipfile.ZipFile(io.BytesIO(package_bytes)) as package:
+                metadata = json.loads(package.read(PACKAGE_METADATA_FILE))
+        except (AttributeError, StopIteration, IndexError, zipfile.BadZipFile, KeyError, ValueError):
+            return self.send_error_json(400, "Invalid import package")
+        job = {
+            "id": uuid.uuid4().hex[:22],
+            "name": "",
+            "start_time": None,
+            "objects": [{"id": obj["objectGuid"], "name": obj["objectName"], "type": obj["objectType"], "path": obj["path"]}
+                        for obj in metadata["exportedObjects"]],
+            "results": dict()
+        }
+        with org.lock:
+            org.map_import_job[job["id"]] = job
+        self.send_json(200, {"jobId": job["id"], "jobStatus": {"state": "NOT_STARTED", "message": ""}, "checksumValid": True})
+
+    def start_import_job(self, org: StandInOrg, map_query: dict, import_id: str, body: bytes):
+        job = org.map_import_job.get(import_id)
+        if job is None:
+            return self.send_error_json(404, f"Import job {import_id} not found")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return self.send_error_json(400, "Invalid import request")
+        specification = payload.get("importSpecification") or {}
+        list_include_id = specification.get("includeObjects") or [obj["id"] for obj in job["objects"]]
+        config = self.server.config
+        with org.lock:
+            if job["start_time"] is not None:
+                return self.send_error_json(400, f"Import job {import_id} is already started")
+            job["name"] = payload.get("name", "")
+            job["start_time"] = time.time()
+            job["duration_sec"] = random.uniform(*config["import_job_sec"])
+            job["objects"] = [obj for obj in job["objects"] if obj["id"] in list_include_id]
+            job["results"] = {obj["id"]: "FAILED" if random.random() < config["job_failure_rate"] else "SUCCESSFUL"
+                              for obj in job["objects"]}
+            list_result = list(job["results"].values())
+            if all(result == "SUCCESSFUL" for result in list_result):
+                job["final_state"] = "SUCCESSFUL"
+            elif all(result == "FAILED" for result in list_result):
+                job["final_state"] = "FAILED"
+            else:
+                job["final_state"] = "PARTIAL"
+            job["applied"] = False
+        self.send_json(200, self.get_import_job_data(org, job, False))
+
+    def get_import_job_data(self, org: StandInOrg, job: dict, expand_objects: bool):
+        if job["start_time"] is None:
+            state = "NOT_STARTED"
+        else:
+            state = get_job_state(job)
+        if state in ("SUCCESSFUL", "PARTIAL", "FAILED"):
+            with org.lock:
+                if not job["applied"]:
+                    # Imported objects appear in the catalog of the org
+                    job["applied"] = True
+                    for obj in job["objects"]:
+                        if job["results"][obj["id"]] == "SUCCESSFUL":
+                            org.add_object(obj["path"], obj["type"], time.time(), obj["id"])
+        data = {"id": job["id"], "name": job["name"], "status": {"state": state, "message": f"Import job {state}"}}
+        if expand_objects:
+            data["objects"] = []
+            for obj in job["objects"]:
+                object_state = job["results"][obj["id"]] if state in ("SUCCESSFUL", "PARTIAL", "FAILED") else state
+                source_object = {"id": obj["id"], "name": obj["name"], "path": obj["path"], "type": obj["type"]}
+                data["objects"].append({"sourceObject": source_object, "targetObject": dict(source_object),
+                                        "status": {"state": object_state, "message": ""}})
+        return data
+
+    def get_import_job(self, org: StandInOrg, map_query: dict, import_id: str):
+        job = org.map_import_job.get(import_id)
+        if job is None:
+            return self.send_error_json(404, f"Import job {import_id} not found")
+        self.send_json(200, self.get_import_job_data(org, job, map_query.get("expand") == "objects"))
+
+    def get_import_log(self, org: StandInOrg, map_query: dict, import_id: str):
+        job = org.map_import_job.get(import_id)
+        if job is None or job["start_time"] is None:
+            return self.send_error_json(404, f"Import job {import_id} not found")
+        state = get_job_state(job)
+        list_line = [f"{get_iso_time(job['start_time'])} Import job '{job['name']}' ({import_id}) {state}"]
+        for obj in job["objects"]:
+            object_state = job["results"][obj["id"]] if state in ("SUCCESSFUL", "PARTIAL", "FAILED") else state
+            list_line.append(f"  {obj['type']} {obj['path']} ({obj['id']}): {object_state}")
+        self.send_body(200, "\n".join(list_line).encode("utf-8"), "text/plain")
+
+#########################################################################################
+
+
+def get_seed_type(type_label: str):
+    return SEED_TYPE_BY_LABEL.get(type_label.strip().lower(), type_label.strip())
+
+
+def read_seed_objects(list_csv_path: list):
+    # ci_cd task CSV: Sr. No, Type, Folder, Asset Name, ...
+    list_seed_object = []
+    for csv_path in list_csv_path:
+        with open(csv_path, mode='r', encoding='utf-8-sig') as csvfile:
+            reader = csv.reader(csvfile, delimiter=',')
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 4 and row[2] and row[3]:
+                    list_seed_object.append((f"{row[2].replace(chr(92), '/')}/{row[3]}", get_seed_type(row[1])))
+    return list_seed_object
+
+
+def load_config(config_path: str = None, **overrides):
+    config = dict(DEFAULT_CONFIG)
+    if config_path:
+        with open(config_path, mode='r', encoding='utf-8') as f:
+            config.update(json.load(f))
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    return config
+
+
+def start_server(config: dict):
+    # Starts the stand-in in a background thread (for benchmarks and scripts), returns the server
+    server = StandInServer(config)
+    threading.Thread(target=server.serve_forever, name="stand_in", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in of the IICS REST API")
+    parser.add_argument("--config", help="JSON file with values of DEFAULT_CONFIG to change")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--seed-csv", nargs="*", dest="seed_csv", help="ci_cd task CSV files, their objects are added to the catalog")
+    parser.add_argument("--verbose", action="store_true", default=None)
+    args = parser.parse_args()
+
+    config = load_config(args.config, host=args.host, port=args.port, seed_csv=args.seed_csv, verbose=args.verbose)
+    server = StandInServer(config)
+    print(f"IICS stand-in server: http://{config['host']}:{server.server_address[1]}")
+    print(f"Login url: http://{config['host']}:{server.server_address[1]}/ma/api/v2/user/login")
+    print(json.dumps(config, indent=2))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
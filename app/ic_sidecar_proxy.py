@@ -0,0 +1,214 @@
+import time
+import hashlib
+import threading
+import logging
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+rootLogger = logging.getLogger()
+
+SIDECAR_STREAM_CHUNK_SIZE = 64 * 1024
+SIDECAR_CONNECT_TIMEOUT_SEC = 30
+SIDECAR_READ_TIMEOUT_SEC = 600
+# Headers of one connection, they are not forwarded (RFC 7230, 6.1)
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+                      "transfer-encoding", "upgrade", "host", "content-length"}
+
+
+# CONNECTION POOLING SIDECAR ############################################################
+
+class SidecarProxy:
+    """
+    Local HTTP proxy started by the orchestrator for the whole CI/CD session.
+    Every IICS environment (serverUrl) is mounted as http://<host>:<port>/<upstream_key>, module processes send
+    their calls there in plain HTTP and the sidecar forwards them over one pool of keep-alive TLS connections
+    per environment, so a new module process does not pay TCP+TLS handshakes again.
+    Idle pooled connections are kept warm with HEAD calls every keep_warm_sec.
+    Bodies are streamed in both directions as is (no decoding of gzip, no buffering of packages).
+    """
+
+    def __init__(self, list_server_url: list, pool_maxsize: int = 20, n_warm_connections: int = 4,
+                 keep_warm_sec: float = 60, host: str = "127.0.0.1", port: int = 0):
+        self.map_upstream = {get_upstream_key(server_url): server_url for server_url in list_server_url if server_url}
+        self.n_warm_connections = n_warm_connections
+        self.keep_warm_sec = keep_warm_sec
+        self.stop_event = threading.Event()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(len(self.map_upstream), 1), pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.server = SidecarServer((host, port), SidecarHandler)
+        self.server.sidecar = self
+        self.host = host
+        self.port = self.server.server_address[1]
+
+        self.lock = threading.Lock()
+        self.n_forwarded = 0
+        self.n_upstream_errors = 0
+
+    def get_url(self, server_url: str):
+        # Base url for IcClient instead of server_url
+        return f"http://{self.host}:{self.port}/{get_upstream_key(server_url)}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="sidecar", daemon=True).start()
+        threading.Thread(target=self.keep_warm, name="sidecar_warm", daemon=True).start()
+        rootLogger.info(f">> [sidecar] started on http://{self.host}:{self.port} for {list(self.map_upstream.values())}")
+
+    def keep_warm(self):
+        while not self.stop_event.is_set():
+            start_time = time.monotonic()
+            with ThreadPoolExecutor(max_workers=self.n_warm_connections * len(self.map_upstream), thread_name_prefix="sidecar_warm") as executor:
+                list(executor.map(self.open_connection, [server_url for server_url in self.map_upstream.values()
+                                                         for i in range(self.n_warm_connections)]))
+            rootLogger.debug(f">> [sidecar] connections kept warm in {time.monotonic() - start_time:.2f} sec")
+            self.stop_event.wait(self.keep_warm_sec)
+
+    def open_connection(self, server_url: str):
+        try:
+            self.session.head(server_url, timeout=SIDECAR_CONNECT_TIMEOUT_SEC).close()
+        except requests.exceptions.RequestException as e:
+            rootLogger.warning(f">> [sidecar] warm-up connection to {server_url} failed: {e}")
+
+    def add_forwarded(self, upstream_error: bool):
+        with self.lock:
+            self.n_forwarded += 1
+            if upstream_error:
+                self.n_upstream_errors += 1
+
+    def get_stats(self):
+        with self.lock:
+            return {"n_forwarded": self.n_forwarded, "n_upstream_errors": self.n_upstream_errors}
+
+    def stop(self):
+        self.stop_event.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.session.close()
+        rootLogger.info(f">> [sidecar] stopped: {self.get_stats()}")
+
+
+class SidecarServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class RequestBodyStream:
+    # Body of the incoming call, read from the socket in chunks while it is sent upstream (length is known)
+
+    def __init__(self, rfile, length: int):
+        self.rfile = rfile
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        n_bytes_left = self.length
+        while n_bytes_left > 0:
+            chunk = self.rfile.read(min(SIDECAR_STREAM_CHUNK_SIZE, n_bytes_left))
+            if not chunk:
+                break
+            n_bytes_left -= len(chunk)
+            yield chunk
+
+
+class SidecarHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.forward()
+
+    def do_HEAD(self):
+        self.forward()
+
+    def do_POST(self):
+        self.forward()
+
+    def do_PUT(self):
+        self.forward()
+
+    def do_PATCH(self):
+        self.forward()
+
+    def do_DELETE(self):
+        self.forward()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_error_response(self, status_code: int, message: str):
+        body = f'{{"error": {{"code": "SIDECAR_{status_code}", "message": "{message}"}}}}'.encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def forward(self):
+        sidecar = self.server.sidecar
+        upstream_key, _, upstream_path = self.path.lstrip("/").partition("/")
+        server_url = sidecar.map_upstream.get(upstream_key)
+        content_length = int(self.headers.get("Content-Length") or 0)
+        if server_url is None:
+            self.rfile.read(content_length)
+            return self.send_error_response(404, f"Unknown upstream '{upstream_key}'")
+
+        headers = {header_name: header_value for header_name, header_value in self.headers.items()
+                   if header_name.lower() not in HOP_BY_HOP_HEADERS}
+        body = RequestBodyStream(self.rfile, content_length) if content_length else None
+        try:
+            response = sidecar.session.request(self.command, f"{server_url}/{upstream_path}", headers=headers, data=body,
+                                               stream=True, allow_redirects=False,
+                                               timeout=(SIDECAR_CONNECT_TIMEOUT_SEC, SIDECAR_READ_TIMEOUT_SEC))
+        except requests.exceptions.Timeout as e:
+            sidecar.add_forwarded(True)
+            self.close_connection = True
+            return self.send_error_response(504, f"Upstream timeout: {type(e).__name__}")
+        except requests.exceptions.RequestException as e:
+            sidecar.add_forwarded(True)
+            self.close_connection = True
+            return self.send_error_response(502, f"Upstream error: {type(e).__name__}")
+
+        with response:
+            self.send_response(response.status_code)
+            for header_name, header_value in response.headers.items():
+                # Server and Date are sent by send_response
+                if header_name.lower() not in HOP_BY_HOP_HEADERS and header_name.lower() not in ("server", "date"):
+                    self.send_header(header_name, header_value)
+            upstream_length = response.headers.get("Content-Length")
+            if upstream_length is not None:
+                self.send_header("Content-Length", upstream_length)
+            elif self.command != "HEAD":
+                self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            if self.command == "HEAD":
+                sidecar.add_forwarded(False)
+                return
+
+            # Encoded bytes are sent as they came (Content-Encoding header is forwarded)
+            try:
+                for chunk in response.raw.stream(SIDECAR_STREAM_CHUNK_SIZE, decode_content=False):
+                    if upstream_length is not None:
+                        self.wfile.write(chunk)
+                    elif chunk:
+                        self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+                if upstream_length is None:
+                    self.wfile.write(b"0\r\n\r\n")
+            except (urllib3.exceptions.HTTPError, OSError):
+                # Upstream broke in the middle of the body: the client sees a broken transfer too
+                sidecar.add_forwarded(True)
+                self.close_connection = True
+                return
+        sidecar.add_forwarded(False)
+
+
+def get_upstream_key(server_url: str):
+    return hashlib.sha256(server_url.encode("utf-8")).hexdigest()[:16]
+
+#########################################################################################
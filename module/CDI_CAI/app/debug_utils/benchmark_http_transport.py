@@ -0,0 +1,162 @@
+import sys
+import json
+import time
+import socket
+import threading
+import statistics
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+
+import h2.config
+import h2.connection
+import h2.events
+
+sys.path.append(str(Path(__file__).parent.parent))
+from ic_client import IcClient
+from ic_http2_transport import Http2Session
+
+
+# Benchmark of IcClient transports: requests (HTTP/1.1 connection pool) vs httpx (HTTP/2 multiplexing).
+# Many small concurrent GETs (like status polls) to a local stand-in server, which answers after RESPONSE_DELAY_SEC.
+# Reported: latency p50/p95, total time, number of TCP connections accepted by the server.
+# Before the benchmark one stream=True call per transport checks the streamed body.
+# Usage: python benchmark_http_transport.py [n_requests] [concurrency]
+
+N_REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+RESPONSE_DELAY_SEC = 0.02
+API_PATH = "/public/core/v3/export/0000000000000000000000/status"
+RESPONSE_BODY = json.dumps({"id": "0000000000000000000000", "status": {"state": "SUCCESSFUL"}}).encode("utf-8")
+
+
+# === HTTP/1.1 stand-in server ===
+class Http1Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(RESPONSE_DELAY_SEC)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Http1Server(ThreadingHTTPServer):
+    daemon_threads = True
+    n_connections = 0
+
+    def process_request(self, request, client_address):
+        self.n_connections += 1
+        super().process_request(request, client_address)
+
+
+# === HTTP/2 (h2c, prior knowledge) stand-in server ===
+class Http2Server:
+
+    def __init__(self):
+        self.listen_socket = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listen_socket.getsockname()[1]
+        self.n_connections = 0
+
+    def serve_forever(self):
+        while True:
+            try:
+                connection_socket, _ = self.listen_socket.accept()
+            except OSError:
+                return
+            self.n_connections += 1
+            threading.Thread(target=self.handle_connection, args=(connection_socket,), daemon=True).start()
+
+    def handle_connection(self, connection_socket):
+        connection = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        lock = threading.Lock()
+        connection.initiate_connection()
+        connection_socket.sendall(connection.data_to_send())
+
+        def respond(stream_id: int):
+            # Streams are answered independently, as a real server does
+            time.sleep(RESPONSE_DELAY_SEC)
+            with lock:
+                connection.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"),
+                                                    ("content-length", str(len(RESPONSE_BODY)))])
+                connection.send_data(stream_id, RESPONSE_BODY, end_stream=True)
+                connection_socket.sendall(connection.data_to_send())
+
+        while True:
+            data = connection_socket.recv(65536)
+            if not data:
+                break
+            with lock:
+                events = connection.receive_data(data)
+                connection_socket.sendall(connection.data_to_send())
+            for event in events:
+                if isinstance(event, h2.events.RequestReceived):
+                    threading.Thread(target=respond, args=(event.stream_id,), daemon=True).start()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    connection_socket.close()
+                    return
+        connection_socket.close()
+
+    def shutdown(self):
+        self.listen_socket.close()
+
+
+def check_stream(transport: str, ic_client: IcClient):
+    # stream=True goes through the iter_content wrappers of IcClient (transfer stats), as catalog pages and downloads do
+    with ic_client.get(API_PATH, stream=True) as response:
+        body = b"".join(response.iter_content(chunk_size=16))
+    assert response.status_code == 200 and body == RESPONSE_BODY, f"{transport}: streamed body differs"
+    print(f"{transport:<24} stream=True: OK ({len(body)} bytes)")
+
+
+def run_benchmark(transport: str, ic_client: IcClient, server):
+    def timed_get(i: int):
+        start_time = time.perf_counter()
+        with ic_client.get(API_PATH) as response:
+            response.content
+            assert response.status_code == 200
+        return time.perf_counter() - start_time
+
+    # Connections are counted from before the stream check, which opens the first connection of the client
+    n_connections_before = server.n_connections
+    check_stream(transport, ic_client)
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        list_latency = list(executor.map(timed_get, range(N_REQUESTS)))
+    total_sec = time.perf_counter() - start_time
+
+    list_latency.sort()
+    print(f"{transport:<24} total: {total_sec:6.2f} sec | "
+          f"p50: {statistics.median(list_latency) * 1000:6.1f} ms | "
+          f"p95: {list_latency[int(len(list_latency) * 0.95) - 1] * 1000:6.1f} ms | "
+          f"connections: {server.n_connections - n_connections_before}")
+
+
+if __name__ == "__main__":
+    print(f"\n=== {N_REQUESTS} GET requests, concurrency {CONCURRENCY}, server delay {RESPONSE_DELAY_SEC * 1000:.0f} ms ===")
+
+    http1_server = Http1Server(("127.0.0.1", 0), Http1Handler)
+    threading.Thread(target=http1_server.serve_forever, daemon=True).start()
+    http1_url = f"http://127.0.0.1:{http1_server.server_address[1]}"
+
+    http2_server = Http2Server()
+    threading.Thread(target=http2_server.serve_forever, daemon=True).start()
+    http2_url = f"http://127.0.0.1:{http2_server.port}"
+
+    with IcClient("BENCHMARK", http1_url, "benchmark", pool_maxsize=CONCURRENCY) as ic_client:
+        run_benchmark("requests (HTTP/1.1)", ic_client, http1_server)
+
+    with IcClient("BENCHMARK", http2_url, "benchmark", pool_maxsize=CONCURRENCY, http2=True) as ic_client:
+        # local server has no TLS (no ALPN), so HTTP/2 is used with prior knowledge
+        ic_client.session.close()
+        ic_client.session = Http2Session(pool_maxsize=CONCURRENCY, http1=False)
+        ic_client.session.headers["INFA-SESSION-ID"] = "benchmark"
+        run_benchmark("httpx (HTTP/2)", ic_client, http2_server)
+
+    http1_server.shutdown()
+    http2_server.shutdown()
@@ -0,0 +1,402 @@
+import io
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+import logging
+import requests
+from urllib.parse import urlsplit
+from requests.structures import CaseInsensitiveDict
+
+
+rootLogger = logging.getLogger()
+
+CASSETTE_RECORD = "record"
+CASSETTE_REPLAY = "replay"
+# Bodies of these types are kept in the cassette (catalog, job status, logs),
+# other bodies (zip packages) only as size and sha256, replay sends random bytes of the same size
+CASSETTE_TEXT_CONTENT_TYPES = ("application/json", "text/")
+CASSETTE_MAX_TEXT_BODY = 16 * 1024 * 1024
+REDACTED = "<redacted>"
+REDACTED_KEYS = {"password", "username", "icSessionId", "sessionId", "securityAnswer"}
+# User data of the login response is redacted only there, so names of objects stay in the cassette
+LOGIN_API_PATH = "/ma/api/v2/user/login"
+REDACTED_LOGIN_KEYS = REDACTED_KEYS | {"name", "emails", "firstName", "lastName", "phone", "securityQuestion"}
+RECORDED_RESPONSE_HEADERS = ("Content-Type", "Content-Length", "Content-Range", "Content-Encoding",
+                             "Content-Disposition", "Accept-Ranges", "Retry-After")
+
+
+# HTTP CASSETTE ##########################################################################
+
+class HttpCassette:
+    """
+    Record / replay of IICS REST traffic of one process (orchestrator or module), one JSON line per call.
+    record: every call is written with status, selected headers, body (secrets redacted) and timing
+        (started_at, headers_sec - time to response headers, total_sec - time to the last byte of the body).
+    replay: calls are answered from the cassette without network, server time of every call is repeated
+        divided by speed (speed 2 - twice faster, 0 - no delays). Calls are matched by environment, method, path,
+        Range and request body; statuses of jobs are chosen by time since the job was created,
+        so a changed scheduler polling more or less often still sees a realistic job progress.
+    """
+
+    def __init__(self, mode: str, cassette_path: str, speed: float = 1.0):
+        if mode not in (CASSETTE_RECORD, CASSETTE_REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.mode = mode
+        self.cassette_path = cassette_path
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.n_recorded = 0
+        self.n_replayed = 0
+        self.n_missed = 0
+
+        if mode == CASSETTE_RECORD:
+            os.makedirs(os.path.dirname(cassette_path) or ".", exist_ok=True)
+            self.file = open(cassette_path, mode='a', encoding='utf-8')
+        else:
+            self.load(cassette_path)
+        rootLogger.info(f">> [cassette] {mode}: {cassette_path}")
+
+    def create_session(self, env_name: str, server_url: str, session):
+        # session - requests.Session (or Http2Session) of the client, replaced by the cassette in replay mode
+        if self.mode == CASSETTE_RECORD:
+            return CassetteRecordingSession(self, env_name, server_url, session)
+        session.close()
+        return CassetteReplaySession(self, env_name, server_url)
+
+    # --- record ---
+    def write(self, interaction: dict):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(json.dumps(interaction) + "\n")
+            self.file.flush()
+            self.n_recorded += 1
+
+    # --- replay ---
+    def load(self, cassette_path: str):
+        self.map_key_interaction = dict()
+        self.map_key_next_index = dict()
+        # id of a job -> time when it was returned by the server (recorded / replayed)
+        self.map_id_recorded_time = dict()
+        self.map_id_replayed_time = dict()
+        with open(cassette_path, mode='r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                self.map_key_interaction.setdefault(interaction["key"], []).append(interaction)
+                for object_id in get_response_ids(interaction):
+                    self.map_id_recorded_time.setdefault(object_id, interaction["started_at"] + interaction["total_sec"])
+        for list_interaction in self.map_key_interaction.values():
+            list_interaction.sort(key=lambda interaction: interaction["started_at"])
+
+    def find_interaction(self, key: str, api_path: str):
+        with self.lock:
+            list_interaction = self.map_key_interaction.get(key)
+            if not list_interaction:
+                self.n_missed += 1
+                return None
+            self.n_replayed += 1
+
+            job_id = next((segment for segment in api_path.split("?")[0].split("/")
+                           if segment in self.map_id_replayed_time), None)
+            if job_id is not None:
+                if self.speed > 0:
+                    elapsed_sec = (time.time() - self.map_id_replayed_time[job_id]) * self.speed
+                else:
+                    elapsed_sec = float("inf")
+                list_due = [interaction for interaction in list_interaction
+                            if interaction["started_at"] - self.map_id_recorded_time[job_id] <= elapsed_sec]
+                return list_due[-1] if list_due else list_interaction[0]
+
+            # Calls without job id are answered in the recorded order, the last answer is repeated
+            index = self.map_key_next_index.get(key, 0)
+            self.map_key_next_index[key] = index + 1
+            return list_interaction[min(index, len(list_interaction) - 1)]
+
+    def on_replayed(self, interaction: dict):
+        with self.lock:
+            for object_id in get_response_ids(interaction):
+                if object_id in self.map_id_recorded_time:
+                    self.map_id_replayed_time.setdefault(object_id, time.time())
+
+    def sleep(self, sec: float):
+        if self.speed > 0 and sec > 0:
+            time.sleep(sec / self.speed)
+
+    def get_stats(self):
+        with self.lock:
+            return {"mode": self.mode, "n_recorded": self.n_recorded, "n_replayed": self.n_replayed, "n_missed": self.n_missed}
+
+    def close(self):
+        if self.mode == CASSETTE_RECORD:
+            self.file.close()
+
+
+class CassetteRecordingSession:
+    # Wraps the session of the client, every call is written to the cassette when its body is read or closed
+
+    def __init__(self, cassette: HttpCassette, env_name: str, server_url: str, session):
+        self.cassette = cassette
+        self.env_name = env_name
+        self.server_url = server_url
+        self.session = session
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def request(self, method: str, url: str, **kwargs):
+        interaction = create_interaction(self.env_name, self.server_url, method, url, kwargs)
+        start_time = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            interaction.update({"headers_sec": round(time.monotonic() - start_time, 4), "error": type(e).__name__, "error_message": str(e)})
+            interaction["total_sec"] = interaction["headers_sec"]
+            self.cassette.write(interaction)
+            raise
+        interaction["headers_sec"] = round(time.monotonic() - start_time, 4)
+        interaction["status_code"] = response.status_code
+        interaction["response_headers"] = {header_name: response.headers[header_name]
+                                           for header_name in RECORDED_RESPONSE_HEADERS if header_name in response.headers}
+        body_recorder = BodyRecorder(self.cassette, interaction, start_time)
+
+        if not kwargs.get("stream"):
+            body_recorder.add(response.content)
+            body_recorder.finish()
+            return response
+
+        iter_content = response.iter_content
+        close = response.close
+
+        def recorded_iter_content(chunk_size: int = 1, decode_unicode: bool = False):
+            try:
+                for chunk in iter_content(chunk_size=chunk_size, decode_unicode=decode_unicode):
+                    body_recorder.add(chunk)
+                    yield chunk
+            except requests.exceptions.RequestException as e:
+                body_recorder.finish(type(e).__name__)
+                raise
+            body_recorder.finish()
+
+        def recorded_close():
+            body_recorder.finish()
+            close()
+
+        response.iter_content = recorded_iter_content
+        response.close = recorded_close
+        return response
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class BodyRecorder:
+
+    def __init__(self, cassette: HttpCassette, interaction: dict, start_time: float):
+        self.cassette = cassette
+        self.interaction = interaction
+        self.start_time = start_time
+        content_type = interaction["response_headers"].get("Content-Type", "")
+        self.is_text = content_type.startswith(CASSETTE_TEXT_CONTENT_TYPES)
+        self.list_chunk = []
+        self.n_bytes = 0
+        self.sha256 = hashlib.sha256()
+        self.finished = False
+
+    def add(self, chunk):
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        self.n_bytes += len(chunk)
+        self.sha256.update(chunk)
+        if self.is_text and self.n_bytes <= CASSETTE_MAX_TEXT_BODY:
+            self.list_chunk.append(chunk)
+
+    def finish(self, body_error: str = None):
+        if self.finished:
+            return
+        self.finished = True
+        self.interaction["total_sec"] = round(time.monotonic() - self.start_time, 4)
+        self.interaction["body_size"] = self.n_bytes
+        self.interaction["body_sha256"] = self.sha256.hexdigest()
+        if self.is_text and self.n_bytes <= CASSETTE_MAX_TEXT_BODY:
+            self.interaction["body"] = redact_body(b"".join(self.list_chunk).decode("utf-8", errors="replace"),
+                                                   self.interaction["path"])
+        if body_error:
+            self.interaction["body_error"] = body_error
+        self.cassette.write(self.interaction)
+
+
+class CassetteReplaySession:
+    # Answers calls of the client from the cassette (requests.Response objects, body is sent at recorded speed)
+
+    def __init__(self, cassette: HttpCassette, env_name: str, server_url: str):
+        self.cassette = cassette
+        self.env_name = env_name
+        self.server_url = server_url
+        self.headers = dict()
+
+    def request(self, method: str, url: str, **kwargs):
+        api_path = get_api_path(self.server_url, url)
+        key = get_interaction_key(self.env_name, method, api_path, kwargs)
+        interaction = self.cassette.find_interaction(key, api_path)
+        if interaction is None:
+            rootLogger.warning(f">> [cassette] no recorded call for '{key}'")
+            return create_response(url, 404, {"Content-Type": "application/json"},
+                                   json.dumps({"error": {"code": "CASSETTE_MISS", "message": f"No recorded call for '{key}'"}}).encode("utf-8"))
+
+        self.cassette.sleep(interaction["headers_sec"])
+        if interaction.get("error"):
+            error_class = getattr(requests.exceptions, interaction["error"], requests.exceptions.ConnectionError)
+            raise error_class(interaction.get("error_message", "recorded error"))
+
+        if "body" in interaction:
+            body = interaction["body"].encode("utf-8")
+        else:
+            body = random.Random(interaction["body_sha256"]).randbytes(interaction["body_size"])
+        headers = {header_name: header_value for header_name, header_value in interaction["response_headers"].items()
+                   if header_name not in ("Content-Length", "Content-Encoding")}
+        headers["Content-Length"] = str(len(body))
+        self.cassette.on_replayed(interaction)
+
+        transfer_sec = max(interaction["total_sec"] - interaction["headers_sec"], 0.0)
+        response = create_response(url, interaction["status_code"], headers,
+                                   ReplayBodyReader(self.cassette, body, transfer_sec, interaction.get("body_error")))
+        if not kwargs.get("stream"):
+            response.content
+        return response
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        pass
+
+
+class ReplayBodyReader:
+    # Raw body of a replayed response, read at the recorded transfer speed
+
+    def __init__(self, cassette: HttpCassette, body: bytes, transfer_sec: float, body_error: str = None):
+        self.cassette = cassette
+        self.body_stream = io.BytesIO(body)
+        self.size = len(body)
+        self.transfer_sec = transfer_sec
+        self.body_error = body_error
+
+    def read(self, size: int = -1):
+        chunk = self.body_stream.read(size)
+        if chunk and self.size:
+            self.cassette.sleep(self.transfer_sec * len(chunk) / self.size)
+        if not chunk and self.body_error:
+            raise getattr(requests.exceptions, self.body_error, requests.exceptions.ChunkedEncodingError)("recorded error")
+        return chunk
+
+    def close(self):
+        self.body_stream.close()
+
+
+def create_response(url: str, status_code: int, headers: dict, body):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response.raw = io.BytesIO(body) if isinstance(body, bytes) else body
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+#########################################################################################
+
+
+def get_api_path(server_url: str, url: str):
+    if server_url and url.startswith(server_url):
+        return url[len(server_url):]
+    url_parts = urlsplit(url)
+    return url_parts.path + (f"?{url_parts.query}" if url_parts.query else "")
+
+
+def get_body_key(kwargs: dict):
+    # Request body part of the key: volatile values (job names contain CI_CD_SESSION_ID, secrets) are removed
+    payload = kwargs.get("json")
+    if isinstance(payload, dict):
+        payload = dict(payload)
+        payload.pop("name", None)
+        payload.pop("password", None)
+        if "username" in payload:
+            payload["username"] = hashlib.sha256(str(payload["username"]).encode("utf-8")).hexdigest()[:16]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    data = kwargs.get("data")
+    if hasattr(data, "file"):
+        # MultipartFileStream: "<object_name>-<CI_CD_SESSION_ID>.zip" -> "<object_name>.zip"
+        return re.sub(r"-\d+(\.zip)$", r"\1", os.path.basename(data.file.name))
+    return ""
+
+
+def get_interaction_key(env_name: str, method: str, api_path: str, kwargs: dict):
+    range_header = (kwargs.get("headers") or {}).get("Range", "")
+    return f"{env_name} {method} {api_path} {range_header} {get_body_key(kwargs)}".strip()
+
+
+def create_interaction(env_name: str, server_url: str, method: str, url: str, kwargs: dict):
+    api_path = get_api_path(server_url, url)
+    interaction = {
+        "key": get_interaction_key(env_name, method, api_path, kwargs),
+        "env": env_name,
+        "method": method,
+        "path": api_path,
+        "started_at": round(time.time(), 4),
+        "thread": threading.current_thread().name
+    }
+    if isinstance(kwargs.get("json"), dict):
+        interaction["request_body"] = redact(kwargs["json"])
+    elif kwargs.get("data") is not None and hasattr(kwargs["data"], "__len__"):
+        interaction["request_body_size"] = len(kwargs["data"])
+    return interaction
+
+
+def redact(value, redacted_keys: set = REDACTED_KEYS):
+    if isinstance(value, dict):
+        return {key: REDACTED if key in redacted_keys else redact(item, redacted_keys) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, redacted_keys) for item in value]
+    return value
+
+
+def redact_body(body: str, api_path: str = ""):
+    redacted_keys = REDACTED_LOGIN_KEYS if api_path.split("?")[0] == LOGIN_API_PATH else REDACTED_KEYS
+    try:
+        return json.dumps(redact(json.loads(body), redacted_keys))
+    except ValueError:
+        return body
+
+
+def get_response_ids(interaction: dict):
+    # Ids of jobs created by the call (export job id, import job id)
+    if interaction.get("method") != "POST" or "body" not in interaction:
+        return []
+    try:
+        data = json.loads(interaction["body"])
+    except ValueError:
+        return []
+    if not isinstance(data, dict):
+        return []
+    return [data[key] for key in ("id", "jobId") if isinstance(data.get(key), str)]
@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import logging
+import tempfile
+from datetime import datetime, timezone, timedelta
+
+
+rootLogger = logging.getLogger()
+
+
+# OBJECT CATALOG CACHE ###################################################################
+
+class ObjectCatalogCache:
+    """
+    Local cache of the objects catalog: one json file per environment (org) and object type.
+    Inside ttl_sec only objects with a newer updateTime are requested (incremental refresh),
+    after ttl_sec the whole catalog of the type is downloaded again (full refresh,
+    it also drops deleted objects from the cache).
+
+    fetch_objects(type, extra_query) must return an iterable of objects from /public/core/v3/objects.
+    """
+
+    # updateTime of the server and local clock can differ a bit
+    CLOCK_SKEW_SEC = 300
+
+    def __init__(self, cache_folder: str, env_key: str, ttl_sec: int, fetch_objects):
+        self.cache_folder = f"{cache_folder}/{env_key}"
+        self.env_key = env_key
+        self.ttl_sec = ttl_sec
+        self.fetch_objects = fetch_objects
+
+    def get_cache_path(self, type: str):
+        return f"{self.cache_folder}/{type}.json"
+
+    def load(self, type: str):
+        cache_path = self.get_cache_path(type)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, mode='r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            rootLogger.warning(f">> [catalog cache] '{cache_path}' is broken and will be rebuilt: {e}")
+            return None
+
+    def save(self, type: str, cache_data: dict):
+        if not os.path.exists(self.cache_folder):
+            os.makedirs(self.cache_folder, exist_ok=True)
+        cache_path = self.get_cache_path(type)
+        # Own temp file per writer: modules refreshing the same org / type at the same time
+        # replace the cache with a complete file each, never with a mixed one
+        with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', dir=self.cache_folder,
+                                         prefix=f"{os.path.basename(cache_path)}.", suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            try:
+                json.dump(cache_data, f)
+            except BaseException:
+                f.close()
+                os.remove(tmp_path)
+                raise
+        os.replace(tmp_path, cache_path)
+
+    def get_object_collection(self, type: str):
+        # Returns path -> id collection for the type, refreshing the cache first
+        cache_data = self.load(type)
+        sync_start = time.time()
+        sync_start_utc = datetime.now(timezone.utc)
+
+        if cache_data is None or sync_start - cache_data.get("last_full_sync", 0) > self.ttl_sec:
+            map_id_path = dict()
+            for obj in self.fetch_objects(type, ""):
+                map_id_path[obj["id"]] = obj["path"]
+            cache_data = {"type": type, "last_full_sync": sync_start, "objects": map_id_path}
+            rootLogger.info(f">> [catalog cache] [{self.env_key}] {type}: full refresh, {len(map_id_path)} objects")
+        else:
+            map_id_path = cache_data["objects"]
+            update_time_from = datetime.fromisoformat(cache_data["last_sync"]) - timedelta(seconds=self.CLOCK_SKEW_SEC)
+            extra_query = f" and updateTime>'{update_time_from.strftime('%Y-%m-%dT%H:%M:%SZ')}'"
+            n_updated = 0
+            for obj in self.fetch_objects(type, extra_query):
+                map_id_path[obj["id"]] = obj["path"]
+                n_updated += 1
+            rootLogger.info(f">> [catalog cache] [{self.env_key}] {type}: incremental refresh, {n_updated} updated objects")
+
+        cache_data["last_sync"] = sync_start_utc.isoformat()
+        self.save(type, cache_data)
+        return {path: id for id, path in map_id_path.items()}
+
+#########################################################################################
@@ -0,0 +1,91 @@
+import time
+import threading
+import logging
+import requests
+
+
+rootLogger = logging.getLogger()
+
+
+# CIRCUIT BREAKER ########################################################################
+
+class CircuitOpenError(Exception):
+    def __init__(self, env_name: str, retry_in_sec: float):
+        self.env_name = env_name
+        self.retry_in_sec = retry_in_sec
+        super().__init__(f"[{env_name}] circuit is open, calls are blocked for {retry_in_sec:.1f} sec")
+
+
+class CircuitBreaker:
+    """
+    One breaker per IICS environment.
+    CLOSED: calls go through, failure_threshold failures in a row open the circuit.
+    OPEN: every call fails at once with CircuitOpenError during open_sec.
+    HALF_OPEN: after open_sec one probe call goes through; success closes the circuit, failure opens it again.
+    Failure - connection error / timeout or 5xx response.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, env_name: str, failure_threshold: int, open_sec: float):
+        self.env_name = env_name
+        self.failure_threshold = failure_threshold
+        self.open_sec = open_sec
+        self.state = self.CLOSED
+        self.n_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.n_opened = 0
+        self.lock = threading.Lock()
+
+    def get_retry_in_sec(self):
+        return max(self.opened_at + self.open_sec - time.monotonic(), 0.0)
+
+    def before_call(self):
+        with self.lock:
+            if self.state == self.OPEN:
+                if self.get_retry_in_sec() > 0:
+                    raise CircuitOpenError(self.env_name, self.get_retry_in_sec())
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+                rootLogger.info(f">> [{self.env_name}] circuit HALF_OPEN, probe call")
+            if self.state == self.HALF_OPEN:
+                if self.probe_in_flight:
+                    raise CircuitOpenError(self.env_name, self.open_sec)
+                self.probe_in_flight = True
+
+    def on_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                rootLogger.info(f">> [{self.env_name}] circuit CLOSED")
+            self.state = self.CLOSED
+            self.n_failures = 0
+            self.probe_in_flight = False
+
+    def on_failure(self):
+        with self.lock:
+            self.n_failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.n_failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probe_in_flight = False
+                self.n_opened += 1
+                rootLogger.error(f">> [{self.env_name}] circuit OPEN after {self.n_failures} failures, calls are blocked for {self.open_sec} sec")
+
+    def call(self, send):
+        # send() -> response
+        self.before_call()
+        try:
+            response = send()
+        except requests.exceptions.RequestException:
+            self.on_failure()
+            raise
+        if response.status_code >= 500:
+            self.on_failure()
+        else:
+            self.on_success()
+        return response
+
+#########################################################################################
@@ -0,0 +1,381 @@
+import os
+import io
+import json
+import time
+import uuid
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from ic_rate_limiter import RateLimiter, get_retry_after_sec
+from ic_retry import RetryStats, get_retry_policy, DEFAULT_RETRY_RULES
+from ic_circuit_breaker import CircuitBreaker
+from ic_http2_transport import Http2Session
+from ic_cassette import HttpCassette
+from ic_transfer_stats import TransferStats, get_endpoint_name
+
+
+rootLogger = logging.getLogger()
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_ATTEMPTS = 5
+SEGMENTED_DOWNLOAD_MIN_SIZE = 64 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+WARM_UP_TIMEOUT_SEC = 10
+# 429 without Retry-After header
+DEFAULT_RETRY_AFTER_SEC = 5
+RETRY_AFTER_MAX_ATTEMPTS = 5
+# Catalog, job statuses and logs are compressible text; packages (zip) are loaded as is,
+# Range offsets of resumed / segmented downloads must point to the stored bytes
+ACCEPT_ENCODING = "gzip, deflate"
+DOWNLOAD_ACCEPT_ENCODING = "identity"
+
+
+# STREAMING MULTIPART BODY ###############################################################
+
+class SegmentRangeError(Exception):
+    # Server answered a segment request without 206 - the file is loaded in a single stream instead
+    pass
+
+
+class MultipartFileStream:
+    """
+    multipart/form-data body with one file field, read from disk in chunks while it is sent.
+    requests takes it as a stream with known length (Content-Length), so the body
+    is never built in memory, whatever the size of the package.
+    """
+
+    def __init__(self, field_name: str, file_path: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.chunk_size = chunk_size
+        self.n_bytes_read = 0
+
+        file_name = os.path.basename(file_path)
+        head = (f"--{self.boundary}\r\n"
+                f"Content-Disposition: form-data; name=\"{field_name}\"; filename=\"{file_name}\"\r\n"
+                f"\r\n").encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self.file = open(file_path, "rb")
+        self.length = len(head) + os.path.getsize(file_path) + len(tail)
+        self.list_part = [io.BytesIO(head), self.file, io.BytesIO(tail)]
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size: int = -1):
+        if size is None or size < 0:
+            size = self.length
+        chunk = b""
+        while self.list_part and len(chunk) < size:
+            data = self.list_part[0].read(size - len(chunk))
+            if not data:
+                self.list_part.pop(0)
+                continue
+            chunk += data
+        self.n_bytes_read += len(chunk)
+        return chunk
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+#########################################################################################
+
+
+# IICS REST CLIENT #######################################################################
+
+class IcClient:
+    """
+    One client per IICS environment (export org / import org).
+    Keeps a keep-alive connection pool and the INFA-SESSION-ID header,
+    so every step of the module reuses the same TCP+TLS connections.
+    """
+
+    def __init__(self, env_name: str, server_url: str, session_id: str, pool_maxsize: int = 10,
+                 token_cache_path: str = None, rate_limiter: RateLimiter = None, retry_rules: list = DEFAULT_RETRY_RULES,
+                 circuit_breaker: CircuitBreaker = None, http2: bool = False, cassette: HttpCassette = None,
+                 sidecar_url: str = None):
+        self.env_name = env_name
+        self.server_url = server_url
+        self.session_id = session_id
+        # Calls go to base_url: server_url or the local sidecar proxy of the orchestrator (pooled connections to server_url)
+        self.base_url = sidecar_url or server_url
+
+        if http2:
+            # All calls are multiplexed over one HTTP/2 connection (falls back to HTTP/1.1 if the server has no h2)
+            self.session = Http2Session(pool_maxsize=pool_maxsize)
+        else:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        if cassette is not None:
+            # Calls are written to the cassette (record) or answered from it without network (replay)
+            self.session = cassette.create_session(env_name, self.base_url, self.session)
+        self.session.headers.update({"INFA-SESSION-ID": session_id, "Accept-Encoding": ACCEPT_ENCODING})
+
+        # Token cache file of the orchestrator: session id renewed there is picked up before next request
+        self.token_cache_path = token_cache_path
+        self.token_cache_mtime = None
+        self.token_lock = threading.Lock()
+
+        # All calls of the environment go through one token bucket
+        self.rate_limiter = rate_limiter
+
+        # Transient errors are repeated by the retry policy of the endpoint (see ic_retry.py)
+        self.retry_rules = retry_rules
+        self.retry_stats = RetryStats()
+
+        # Fails fast with CircuitOpenError while the environment is down
+        self.circuit_breaker = circuit_breaker
+
+        # Compressed (wire) and decoded bytes per endpoint
+        self.transfer_stats = TransferStats()
+        rootLogger.info(f">> [{env_name}] IcClient created for {server_url} (pool_maxsize: {pool_maxsize}, http2: {http2}, sidecar: {sidecar_url})")
+
+    def refresh_session_id(self):
+        if not self.token_cache_path:
+            return
+        try:
+            token_cache_mtime = os.stat(self.token_cache_path).st_mtime_ns
+        except OSError:
+            return
+        if token_cache_mtime == self.token_cache_mtime:
+            return
+        with self.token_lock:
+            if token_cache_mtime == self.token_cache_mtime:
+                return
+            try:
+                with open(self.token_cache_path, mode='r', encoding='utf-8') as f:
+                    token = json.load(f)
+            except (OSError, ValueError):
+                return
+            self.token_cache_mtime = token_cache_mtime
+            session_id = token.get("session_id")
+            if session_id and session_id != self.session_id:
+                self.session_id = session_id
+                self.session.headers["INFA-SESSION-ID"] = session_id
+                rootLogger.info(f">> [{self.env_name}] session id refreshed from token cache")
+
+    def request(self, method: str, api_path: str, **kwargs):
+        retry_policy = get_retry_policy(self.retry_rules, method, api_path)
+        return retry_policy.call(lambda: self.request_once(method, api_path, **kwargs),
+                                 f"[{self.env_name}] {method} {api_path}", self.retry_stats)
+
+    def request_once(self, method: str, api_path: str, **kwargs):
+        self.refresh_session_id()
+        api_url = self.base_url + api_path
+        session_id = self.session_id
+        response = self.send(method, api_url, **kwargs)
+
+        if response.status_code == 401 and "data" not in kwargs:
+            # Session could be renewed right now, re-read token cache and repeat once
+            self.token_cache_mtime = None
+            self.refresh_session_id()
+            if self.session_id != session_id:
+                response.close()
+                response = self.send(method, api_url, **kwargs)
+        return response
+
+    def send(self, method: str, api_url: str, **kwargs):
+        # Takes a token from rate_limiter before each call; 429/503 with Retry-After pause
+        # all calls of the environment and the call is repeated (streamed bodies can not be repeated)
+        for attempt in range(1, RETRY_AFTER_MAX_ATTEMPTS + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            if self.circuit_breaker is not None:
+                response = self.circuit_breaker.call(lambda: self.session.request(method, api_url, **kwargs))
+            else:
+                response = self.session.request(method, api_url, **kwargs)
+            self.transfer_stats.track(f"{method} {get_endpoint_name(api_url[len(self.base_url):])}", response, kwargs.get("stream", False))
+            if response.status_code not in (429, 503) or self.rate_limiter is None:
+                return response
+
+            retry_after_sec = get_retry_after_sec(response.headers.get("Retry-After"))
+            if retry_after_sec is None and response.status_code == 429:
+                retry_after_sec = DEFAULT_RETRY_AFTER_SEC
+            if retry_after_sec is None or "data" in kwargs or attempt == RETRY_AFTER_MAX_ATTEMPTS:
+                return response
+            rootLogger.warning(f">> [{self.env_name}] {response.status_code} for {method} {api_url}, retry after {retry_after_sec:.1f} sec ({attempt}/{RETRY_AFTER_MAX_ATTEMPTS})")
+            response.close()
+            self.rate_limiter.pause(retry_after_sec)
+        return response
+
+    def get(self, api_path: str, **kwargs):
+        return self.request("GET", api_path, **kwargs)
+
+    def post(self, api_path: str, **kwargs):
+        return self.request("POST", api_path, **kwargs)
+
+    def warm_up(self, n_connections: int = 2):
+        # Opens n_connections (TCP+TLS) to base_url in parallel, they stay in the pool for the next requests
+        def open_connection(i: int):
+            try:
+                self.session.head(self.base_url, timeout=WARM_UP_TIMEOUT_SEC).close()
+            except requests.exceptions.RequestException as e:
+                rootLogger.warning(f">> [{self.env_name}] warm-up connection failed: {e}")
+
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=n_connections, thread_name_prefix="warm_up") as executor:
+            list(executor.map(open_connection, range(n_connections)))
+        rootLogger.info(f">> [{self.env_name}] {n_connections} connections warmed up in {time.monotonic() - start_time:.2f} sec")
+
+    def download(self, api_path: str, file_path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                 n_attempts: int = DOWNLOAD_ATTEMPTS, n_segments: int = 1):
+        # Streams response body in chunks to "<file_path>.part" and renames it to file_path when done,
+        # so the whole file is never kept in memory and file_path never contains a partial file.
+        # A transfer broken within this call is resumed from the size of the ".part" file with a Range request,
+        # if the server ignores Range (200 instead of 206) the download restarts from 0.
+        # A ".part" file left by an earlier call (e.g. of another export job with the same file name) is removed.
+        # n_segments > 1: big files are loaded in parallel range segments (one more Range probe request).
+        # Returns (status_code, n_bytes), status_code is 200 or 206 on success, n_bytes - size of the file
+        # (bytes kept in ".part" plus the body received after the last restart, discarded bytes are not counted)
+        start_time = time.monotonic()
+        part_path = f"{file_path}.part"
+        if os.path.exists(part_path):
+            rootLogger.warning(f">> [{self.env_name}] stale partial file of an earlier download is removed: '{part_path}'")
+            os.remove(part_path)
+
+        if n_segments > 1:
+            probe_response, total_size = self.get_download_size(api_path)
+            if total_size is not None and total_size >= SEGMENTED_DOWNLOAD_MIN_SIZE:
+                try:
+                    n_bytes = self.download_segments(api_path, file_path, total_size, n_segments, chunk_size, n_attempts)
+                    self.log_transfer("downloaded", n_bytes, start_time)
+                    return probe_response.status_code, n_bytes
+                except SegmentRangeError as e:
+                    rootLogger.warning(f">> [{self.env_name}] {e}, download in a single stream")
+                    os.remove(part_path)
+
+        n_bytes = 0
+        status_code = 0
+        for attempt in range(1, n_attempts + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            n_bytes = offset
+            headers = {"Accept-Encoding": DOWNLOAD_ACCEPT_ENCODING}
+            if offset > 0:
+                headers["Range"] = f"bytes={offset}-"
+            try:
+                with self.get(api_path, stream=True, headers=headers) as response:
+                    status_code = response.status_code
+                    if response.status_code == 416 and response.headers.get("Content-Range", "").endswith(f"/{offset}"):
+                        # ".part" file is already complete
+                        status_code = 206
+                        break
+                    if response.status_code == 416:
+                        rootLogger.warning(f">> [{self.env_name}] range not satisfiable, restart download of '{file_path}'")
+                        os.remove(part_path)
+                        status_code = 0
+                        continue
+                    if response.status_code not in (200, 206):
+                        rootLogger.error(f">> [{self.env_name}] Error {response.status_code}: {response.text}")
+                        return status_code, n_bytes
+                    if offset > 0 and response.status_code == 200:
+                        rootLogger.warning(f">> [{self.env_name}] server does not support Range, restart download of '{file_path}'")
+
+                    mode = "ab" if response.status_code == 206 else "wb"
+                    if mode == "wb":
+                        n_bytes = 0
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+                            n_bytes += len(chunk)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout) as e:
+                rootLogger.warning(f">> [{self.env_name}] download of '{file_path}' broken ({attempt}/{n_attempts}): {e}")
+                if attempt == n_attempts:
+                    raise
+        if status_code not in (200, 206):
+            return status_code, n_bytes
+        os.replace(part_path, file_path)
+
+        self.log_transfer("downloaded", n_bytes, start_time)
+        return status_code, n_bytes
+
+    def get_download_size(self, api_path: str):
+        # Asks for the first byte only: 206 with "Content-Range: bytes 0-0/<size>" means Range is supported
+        with self.get(api_path, stream=True, headers={"Range": "bytes=0-0", "Accept-Encoding": DOWNLOAD_ACCEPT_ENCODING}) as response:
+            content_range = response.headers.get("Content-Range", "")
+            if response.status_code == 206 and "/" in content_range and not content_range.endswith("/*"):
+                return response, int(content_range.rsplit("/", 1)[1])
+            return response, None
+
+    def download_segments(self, api_path: str, file_path: str, total_size: int, n_segments: int,
+                          chunk_size: int, n_attempts: int):
+        part_path = f"{file_path}.part"
+        with open(part_path, "wb") as f:
+            f.truncate(total_size)
+
+        segment_size = -(-total_size // n_segments)
+        list_segment = [(start, min(start + segment_size, total_size) - 1) for start in range(0, total_size, segment_size)]
+
+        def load_segment(segment: tuple):
+            position, end = segment
+            for attempt in range(1, n_attempts + 1):
+                try:
+                    with self.get(api_path, stream=True, headers={"Range": f"bytes={position}-{end}",
+                                                                  "Accept-Encoding": DOWNLOAD_ACCEPT_ENCODING}) as response:
+                        if response.status_code != 206:
+                            raise SegmentRangeError(f"Error {response.status_code}: segment {position}-{end} of '{file_path}'")
+                        with open(part_path, "r+b") as f:
+                            f.seek(position)
+                            for chunk in response.iter_content(chunk_size=chunk_size):
+                                f.write(chunk)
+                                position += len(chunk)
+                    return
+                except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.Timeout) as e:
+                    rootLogger.warning(f">> [{self.env_name}] segment {position}-{end} of '{file_path}' broken ({attempt}/{n_attempts}): {e}")
+                    if attempt == n_attempts:
+                        raise
+
+        rootLogger.info(f">> [{self.env_name}] download '{file_path}' ({total_size} bytes) in {len(list_segment)} segments")
+        with ThreadPoolExecutor(max_workers=len(list_segment), thread_name_prefix="segment") as executor:
+            list(executor.map(load_segment, list_segment))
+        os.replace(part_path, file_path)
+        return total_size
+
+    def log_transfer(self, action: str, n_bytes: int, start_time: float):
+        elapsed_sec = max(time.monotonic() - start_time, 1e-6)
+        rootLogger.info(f">> [{self.env_name}] {action} {n_bytes} bytes in {elapsed_sec:.2f} sec ({n_bytes / elapsed_sec:.0f} bytes/sec)")
+
+    def upload(self, api_path: str, field_name: str, file_path: str, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        # Posts file_path as multipart/form-data field, streaming it from disk in chunks
+        # (a new body stream is opened for every attempt of the retry policy)
+        def post_file():
+            start_time = time.monotonic()
+            with MultipartFileStream(field_name, file_path, chunk_size) as body:
+                response = self.request_once("POST", api_path, data=body, headers={"Content-Type": body.content_type})
+                n_bytes = body.n_bytes_read
+            self.log_transfer("uploaded", n_bytes, start_time)
+            return response
+
+        retry_policy = get_retry_policy(self.retry_rules, "POST", api_path)
+        return retry_policy.call(post_file, f"[{self.env_name}] POST {api_path}", self.retry_stats)
+
+    def close(self):
+        self.session.close()
+        rootLogger.info(f">> [{self.env_name}] IcClient closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+#########################################################################################
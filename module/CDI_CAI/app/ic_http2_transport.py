@@ -0,0 +1,146 @@
+import threading
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+HTTP2_TIMEOUT_SEC = 120
+HTTP2_CONNECT_TIMEOUT_SEC = 10
+
+
+# OPTIONAL HTTP/2 TRANSPORT ##############################################################
+# Drop-in replacement of requests.Session for IcClient based on httpx (pip install "httpx[http2]").
+# All concurrent calls to one serverUrl are multiplexed as streams of one HTTP/2 connection.
+# Responses and exceptions look like requests ones, so retry policy, circuit breaker
+# and the REST helpers work without changes.
+
+class Http2Session:
+
+    def __init__(self, pool_maxsize: int = 10, http1: bool = True):
+        # http1=False - HTTP/2 without TLS negotiation ("prior knowledge", e.g. local h2c stand-in server)
+        if httpx is None:
+            raise ImportError("HTTP/2 transport needs httpx: pip install \"httpx[http2]\"")
+        limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        timeout = httpx.Timeout(HTTP2_TIMEOUT_SEC, connect=HTTP2_CONNECT_TIMEOUT_SEC)
+        self.client = httpx.Client(http1=http1, http2=True, limits=limits, timeout=timeout, follow_redirects=True)
+        self.headers = dict()
+        self.request_start_lock = threading.Lock()
+
+    def request(self, method: str, url: str, stream: bool = False, headers: dict = None, json=None,
+                data=None, params=None, timeout: float = None):
+        request_headers = {**self.headers, **(headers or {})}
+        content = None
+        if data is not None:
+            if hasattr(data, "__len__"):
+                request_headers.setdefault("Content-Length", str(len(data)))
+            content = data if isinstance(data, (bytes, str)) else iter(data)
+
+        # httpcore takes the stream id and writes the headers of concurrent requests without a common lock,
+        # so ids could reach the server out of order (PROTOCOL_ERROR). Starts of requests are serialized
+        # until the headers are written (httpcore trace event), bodies and responses stay concurrent
+        start_lock = RequestStartLock(self.request_start_lock)
+        request = self.client.build_request(method, url, headers=request_headers, json=json, content=content, params=params,
+                                            timeout=timeout if timeout is not None else self.client.timeout,
+                                            extensions={"trace": start_lock.trace})
+        start_lock.acquire()
+        try:
+            response = self.client.send(request, stream=stream)
+        except httpx.TransportError as e:
+            raise get_requests_error(e) from e
+        finally:
+            start_lock.release()
+        return Http2Response(response)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+class RequestStartLock:
+    # Holds the lock of the session from the start of one request until its headers are sent
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.locked = False
+
+    def acquire(self):
+        self.lock.acquire()
+        self.locked = True
+
+    def release(self):
+        if self.locked:
+            self.locked = False
+            self.lock.release()
+
+    def trace(self, event_name: str, info: dict):
+        if event_name.endswith(("send_request_headers.complete", "send_request_headers.failed")):
+            self.release()
+
+
+class Http2Response:
+    # Subset of requests.Response used by the project
+
+    def __init__(self, response):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+
+    @property
+    def num_bytes_downloaded(self):
+        return self.response.num_bytes_downloaded
+
+    @property
+    def content(self):
+        try:
+            return self.response.read()
+        except httpx.TransportError as e:
+            raise get_requests_error(e, streaming=True) from e
+
+    @property
+    def text(self):
+        self.content
+        return self.response.text
+
+    def json(self):
+        self.content
+        return self.response.json()
+
+    def iter_content(self, chunk_size: int = 1024 * 1024, decode_unicode: bool = False):
+        # Same signature as requests.Response.iter_content (wrappers of ic_cassette / ic_transfer_stats pass both)
+        try:
+            iter_chunk = self.response.iter_text(chunk_size=chunk_size) if decode_unicode else self.response.iter_bytes(chunk_size=chunk_size)
+            for chunk in iter_chunk:
+                yield chunk
+        except httpx.TransportError as e:
+            raise get_requests_error(e, streaming=True) from e
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def get_requests_error(e, streaming: bool = False):
+    # httpx exception -> requests exception of the same meaning
+    if isinstance(e, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(str(e))
+    if isinstance(e, httpx.TimeoutException):
+        return requests.exceptions.Timeout(str(e))
+    if streaming and isinstance(e, (httpx.ReadError, httpx.RemoteProtocolError)):
+        return requests.exceptions.ChunkedEncodingError(str(e))
+    return requests.exceptions.ConnectionError(str(e))
+
+#########################################################################################
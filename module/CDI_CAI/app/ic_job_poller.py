@@ -0,0 +1,128 @@
+import time
+import heapq
+import itertools
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ic_circuit_breaker import CircuitOpenError
+
+
+rootLogger = logging.getLogger()
+
+
+# JOB STATUS POLLER ######################################################################
+
+class JobStatusPoller:
+    """
+    One scheduler thread checks the status of all outstanding export / import jobs, instead of a polling loop per job.
+    Every job is checked every pause_sec (the job due first is checked first, so jobs take turns),
+    at most max_polls times. Checks run on max_workers threads, so a slow check (or a slow environment)
+    does not hold the checks of other jobs; a job has at most one check in flight.
+    A failed check is repeated in the next round (after pause_sec), after max_failures failures in a row
+    the future of the job gets the exception. CircuitOpenError goes to the future at once, the caller
+    pauses or stops on an open circuit (CIRCUIT_BREAKER_ON_OPEN of main.py).
+    Otherwise the future gets the last state when it is one of terminal_states or after max_polls checks.
+    The number of status calls follows the number of outstanding jobs, not the number of waiting threads.
+    """
+
+    def __init__(self, name: str = "job_poller", max_workers: int = 4, max_failures: int = 5):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_failures = max_failures
+        self.condition = threading.Condition()
+        self.list_due_job = []
+        self.sequence = itertools.count()
+        self.thread = None
+        self.executor = None
+        self.stopped = False
+        self.n_jobs = 0
+        self.n_polls = 0
+        self.n_failed_polls = 0
+        self.max_outstanding = 0
+
+    def submit(self, label: str, check_status, terminal_states: tuple, pause_sec: float, max_polls: int):
+        # check_status() returns the state of the job; the first check is done after pause_sec
+        job = {"label": label, "check_status": check_status, "terminal_states": terminal_states,
+               "pause_sec": pause_sec, "max_polls": max_polls, "n_polls": 0, "n_failures": 0, "future": Future()}
+        with self.condition:
+            if self.stopped:
+                raise RuntimeError(f"[{self.name}] poller is stopped")
+            if self.thread is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+            self.schedule(job, pause_sec)
+            self.n_jobs += 1
+        return job["future"]
+
+    def schedule(self, job: dict, delay_sec: float):
+        # self.condition is held by the caller
+        heapq.heappush(self.list_due_job, (time.monotonic() + delay_sec, next(self.sequence), job))
+        self.max_outstanding = max(self.max_outstanding, len(self.list_due_job))
+        self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.stopped:
+                        return
+                    if not self.list_due_job:
+                        self.condition.wait()
+                        continue
+                    wait_sec = self.list_due_job[0][0] - time.monotonic()
+                    if wait_sec <= 0:
+                        job = heapq.heappop(self.list_due_job)[2]
+                        break
+                    self.condition.wait(wait_sec)
+            self.executor.submit(self.poll, job)
+
+    def poll(self, job: dict):
+        try:
+            state = job["check_status"]()
+        except CircuitOpenError as e:
+            rootLogger.warning(f"{job['label']} >> status check stopped: {e}")
+            job["future"].set_exception(e)
+            return
+        except Exception as e:
+            job["n_failures"] += 1
+            with self.condition:
+                self.n_failed_polls += 1
+                if job["n_failures"] < self.max_failures and not self.stopped:
+                    rootLogger.warning(f"{job['label']} >> status check failed ({job['n_failures']}/{self.max_failures}), "
+                                       f"repeated in {job['pause_sec']:.1f} sec: {e}")
+                    self.schedule(job, job["pause_sec"])
+                    return
+            rootLogger.error(f"{job['label']} >> status check failed ({job['n_failures']}/{self.max_failures}): {e}")
+            job["future"].set_exception(e)
+            return
+
+        job["n_polls"] += 1
+        job["n_failures"] = 0
+        rootLogger.info(f"{job['label']} >> [{job['n_polls']}] check status: {state}")
+        with self.condition:
+            self.n_polls += 1
+            if state not in job["terminal_states"] and job["n_polls"] < job["max_polls"] and not self.stopped:
+                self.schedule(job, job["pause_sec"])
+                return
+        job["future"].set_result(state)
+
+    def get_stats(self):
+        with self.condition:
+            return {"n_jobs": self.n_jobs, "n_polls": self.n_polls, "n_failed_polls": self.n_failed_polls,
+                    "max_outstanding": self.max_outstanding, "n_outstanding": len(self.list_due_job)}
+
+    def stop(self):
+        # Jobs still waiting for a check are cancelled, checks in flight are finished
+        with self.condition:
+            self.stopped = True
+            for _, _, job in self.list_due_job:
+                job["future"].cancel()
+            self.list_due_job = []
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.executor.shutdown(wait=True)
+
+#########################################################################################
@@ -0,0 +1,108 @@
+import json
+import codecs
+
+
+# INCREMENTAL JSON PARSING ###############################################################
+# Parses a response like {"count": 2, "objects": [{...}, {...}]} chunk by chunk:
+# items of one top-level array are yielded one by one as soon as they are complete,
+# the whole document is never kept in memory (only the current chunk and the current item).
+
+JSON_DECODER = json.JSONDecoder()
+JSON_WHITESPACE = " \t\n\r"
+
+
+class JsonChunkReader:
+    # Text buffer over an iterator of byte chunks
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        self.finished = False
+
+    def read_more(self):
+        # Drops the parsed part of the buffer and appends the next chunk, False at the end of the stream
+        if self.finished:
+            return False
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.buffer += self.decoder.decode(b"", final=True)
+            self.finished = True
+            return False
+        self.buffer += self.decoder.decode(chunk)
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in JSON_WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer) or not self.read_more():
+                return
+
+    def next_char(self):
+        self.skip_whitespace()
+        if self.position >= len(self.buffer):
+            raise ValueError("Unexpected end of JSON stream")
+        return self.buffer[self.position]
+
+    def expect(self, char: str):
+        if self.next_char() != char:
+            raise ValueError(f"Expected '{char}' at position {self.position} of JSON stream")
+        self.position += 1
+
+    def read_value(self):
+        # One complete JSON value; a value that ends exactly at the end of the buffer
+        # (e.g. number 12 of 123) is parsed again when the next chunk is read
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = JSON_DECODER.raw_decode(self.buffer, self.position)
+                if end < len(self.buffer) or self.finished:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.finished:
+                    raise
+            self.read_more()
+
+
+def iter_json_array_items(chunks, array_key: str, other_values: dict = None):
+    # Yields items of the top-level array array_key.
+    # Other top-level values (e.g. "count") are put into other_values, values after the array
+    # are there only when the generator is exhausted
+    reader = JsonChunkReader(chunks)
+    reader.expect("{")
+    if reader.next_char() == "}":
+        return
+    while True:
+        key = reader.read_value()
+        reader.expect(":")
+        if key == array_key:
+            reader.expect("[")
+            if reader.next_char() == "]":
+                reader.position += 1
+            else:
+                while True:
+                    yield reader.read_value()
+                    char = reader.next_char()
+                    reader.position += 1
+                    if char == "]":
+                        break
+                    if char != ",":
+                        raise ValueError(f"Expected ',' or ']' in '{array_key}' of JSON stream")
+        else:
+            value = reader.read_value()
+            if other_values is not None:
+                other_values[key] = value
+
+        char = reader.next_char()
+        reader.position += 1
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError("Expected ',' or '}' in JSON stream")
+
+#########################################################################################
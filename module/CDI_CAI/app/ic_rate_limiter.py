@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+rootLogger = logging.getLogger()
+
+
+# RATE LIMITER ###########################################################################
+
+class RateLimiter:
+    """
+    Token bucket for all REST calls to one IICS environment (export org / import org).
+    rate_per_sec tokens are added every second up to burst, every call takes one token.
+    pause() stops all callers, e.g. for Retry-After of 429/503 responses.
+    """
+
+    def __init__(self, env_name: str, rate_per_sec: float, burst: int):
+        self.env_name = env_name
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+        # counters
+        self.n_acquired = 0
+        self.n_throttled = 0
+        self.throttled_sec = 0.0
+        self.n_retry_after = 0
+        self.retry_after_sec = 0.0
+
+    def acquire(self):
+        start_time = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_per_sec)
+                self.last_refill = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.n_acquired += 1
+                    wait_sec = now - start_time
+                    if wait_sec > 0.001:
+                        self.n_throttled += 1
+                        self.throttled_sec += wait_sec
+                    return wait_sec
+                sleep_sec = max(self.paused_until - now, (1 - self.tokens) / self.rate_per_sec)
+            time.sleep(sleep_sec)
+
+    def pause(self, pause_sec: float):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + pause_sec)
+            self.n_retry_after += 1
+            self.retry_after_sec += pause_sec
+        rootLogger.warning(f">> [{self.env_name}] rate limit: all calls paused for {pause_sec:.1f} sec")
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "n_acquired": self.n_acquired,
+                "n_throttled": self.n_throttled,
+                "throttled_sec": round(self.throttled_sec, 3),
+                "n_retry_after": self.n_retry_after,
+                "retry_after_sec": round(self.retry_after_sec, 3)
+            }
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    Token bucket shared by all module processes that call the same serverUrl.
+    State of the bucket (tokens, last refill, pause) is kept in a small file under quota_folder,
+    every acquire()/pause() changes it under an exclusive file lock.
+    rate_per_sec and burst are the quota of the whole org, not of one process.
+    """
+
+    def __init__(self, env_name: str, rate_per_sec: float, burst: int, quota_folder: str, server_url: str):
+        super().__init__(env_name, rate_per_sec, burst)
+        os.makedirs(quota_folder, exist_ok=True)
+        quota_key = hashlib.sha256(server_url.encode("utf-8")).hexdigest()[:16]
+        self.quota_path = f"{quota_folder}/{quota_key}.quota"
+        open(self.quota_path, "ab").close()
+
+    def update_state(self, update):
+        # update(state) -> result; state is changed in place and saved while the file is locked
+        with open(self.quota_path, "r+b") as f:
+            lock_file(f)
+            try:
+                data = f.read()
+                try:
+                    state = json.loads(data) if data else None
+                except ValueError:
+                    state = None
+                if state is None:
+                    state = {"tokens": float(self.burst), "last_refill": time.time(), "paused_until": 0.0}
+                result = update(state)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state).encode("utf-8"))
+                f.flush()
+            finally:
+                unlock_file(f)
+        return result
+
+    def acquire(self):
+        start_time = time.monotonic()
+
+        def take_token(state: dict):
+            now = time.time()
+            state["tokens"] = min(self.burst, state["tokens"] + max(now - state["last_refill"], 0) * self.rate_per_sec)
+            state["last_refill"] = now
+            if now >= state["paused_until"] and state["tokens"] >= 1:
+                state["tokens"] -= 1
+                return 0.0
+            return max(state["paused_until"] - now, (1 - state["tokens"]) / self.rate_per_sec)
+
+        while True:
+            sleep_sec = self.update_state(take_token)
+            if sleep_sec == 0.0:
+                break
+            time.sleep(sleep_sec)
+
+        wait_sec = time.monotonic() - start_time
+        with self.lock:
+            self.n_acquired += 1
+            if wait_sec > 0.001:
+                self.n_throttled += 1
+                self.throttled_sec += wait_sec
+        return wait_sec
+
+    def pause(self, pause_sec: float):
+        def set_pause(state: dict):
+            state["paused_until"] = max(state["paused_until"], time.time() + pause_sec)
+
+        self.update_state(set_pause)
+        with self.lock:
+            self.n_retry_after += 1
+            self.retry_after_sec += pause_sec
+        rootLogger.warning(f">> [{self.env_name}] shared rate limit: all calls paused for {pause_sec:.1f} sec")
+
+
+def lock_file(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    f.seek(0)
+
+
+def unlock_file(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def get_retry_after_sec(retry_after: str):
+    # Retry-After is either number of seconds or HTTP-date
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+#########################################################################################
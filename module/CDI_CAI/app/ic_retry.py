@@ -0,0 +1,114 @@
+import re
+import time
+import random
+import threading
+import logging
+import requests
+
+
+rootLogger = logging.getLogger()
+
+
+# RETRY POLICY ###########################################################################
+
+class RetryPolicy:
+    """
+    How one kind of REST call is repeated: number of attempts, exponential backoff with jitter,
+    which status codes and exceptions are transient.
+    Idempotent GETs can be repeated on any transient error, job-creating POSTs only when
+    the server surely did not create the job (gateway errors, connection not established).
+    """
+
+    def __init__(self, name: str, max_attempts: int, base_delay_sec: float, max_delay_sec: float,
+                 retry_status_codes: tuple = (500, 502, 503, 504),
+                 retry_exceptions: tuple = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay_sec = base_delay_sec
+        self.max_delay_sec = max_delay_sec
+        self.retry_status_codes = retry_status_codes
+        self.retry_exceptions = retry_exceptions
+
+    def get_delay_sec(self, attempt: int):
+        # Exponential backoff with "equal jitter": half of the delay is fixed, half is random
+        delay_sec = min(self.max_delay_sec, self.base_delay_sec * 2 ** (attempt - 1))
+        return delay_sec / 2 + random.uniform(0, delay_sec / 2)
+
+    def call(self, send, description: str, retry_stats=None):
+        # send() -> response, it is called again for every attempt
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = send()
+            except self.retry_exceptions as e:
+                if attempt == self.max_attempts:
+                    if retry_stats is not None:
+                        retry_stats.add_failed(self.name)
+                    raise
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code not in self.retry_status_codes:
+                    return response
+                if attempt == self.max_attempts:
+                    if retry_stats is not None:
+                        retry_stats.add_failed(self.name)
+                    return response
+                reason = f"status {response.status_code}"
+                response.close()
+
+            delay_sec = self.get_delay_sec(attempt)
+            rootLogger.warning(f">> [retry: {self.name}] {description} failed ({reason}), attempt {attempt}/{self.max_attempts}, next in {delay_sec:.1f} sec")
+            if retry_stats is not None:
+                retry_stats.add_retry(self.name, delay_sec)
+            time.sleep(delay_sec)
+
+
+class RetryStats:
+    # Retries, time spent in backoff and calls that failed after all attempts, per policy
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.map_policy_stats = dict()
+
+    def get_policy_stats(self, policy_name: str):
+        return self.map_policy_stats.setdefault(policy_name, {"n_retries": 0, "backoff_sec": 0.0, "n_failed": 0})
+
+    def add_retry(self, policy_name: str, delay_sec: float):
+        with self.lock:
+            policy_stats = self.get_policy_stats(policy_name)
+            policy_stats["n_retries"] += 1
+            policy_stats["backoff_sec"] = round(policy_stats["backoff_sec"] + delay_sec, 3)
+
+    def add_failed(self, policy_name: str):
+        with self.lock:
+            self.get_policy_stats(policy_name)["n_failed"] += 1
+
+    def get_stats(self):
+        with self.lock:
+            return {policy_name: dict(policy_stats) for policy_name, policy_stats in self.map_policy_stats.items()}
+
+
+def get_retry_policy(retry_rules: list, method: str, api_path: str):
+    # retry_rules - list of (method, api_path regex, RetryPolicy), the first matching rule wins
+    for rule_method, rule_path_pattern, retry_policy in retry_rules:
+        if rule_method == method and re.match(rule_path_pattern, api_path):
+            return retry_policy
+    return NO_RETRY
+
+
+NO_RETRY = RetryPolicy("no_retry", 1, 0, 0)
+
+# Defaults for IICS REST calls of the project
+DEFAULT_RETRY_RULES = [
+    ("GET", r".*", RetryPolicy("get", max_attempts=5, base_delay_sec=1, max_delay_sec=30)),
+    ("POST", r"^/public/core/v3/export$",
+     RetryPolicy("create_export_job", max_attempts=3, base_delay_sec=2, max_delay_sec=30,
+                 retry_status_codes=(502, 503, 504), retry_exceptions=(requests.exceptions.ConnectTimeout,))),
+    ("POST", r"^/public/core/v3/import/package$",
+     RetryPolicy("upload_import_package", max_attempts=3, base_delay_sec=2, max_delay_sec=30,
+                 retry_status_codes=(502, 503, 504))),
+    ("POST", r"^/public/core/v3/import/[^/]+$",
+     RetryPolicy("create_import_job", max_attempts=3, base_delay_sec=2, max_delay_sec=30,
+                 retry_status_codes=(502, 503, 504), retry_exceptions=(requests.exceptions.ConnectTimeout,))),
+]
+
+#########################################################################################
@@ -0,0 +1,80 @@
+import re
+import threading
+
+
+# TRANSFER STATS #########################################################################
+
+class TransferStats:
+    """
+    Bytes received per endpoint: wire_bytes - as sent by the server (compressed if Content-Encoding is gzip/deflate),
+    body_bytes - after decoding. Streamed bodies are counted when the response is closed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.map_endpoint_stats = dict()
+
+    def add(self, endpoint: str, content_encoding: str, wire_bytes: int, body_bytes: int):
+        with self.lock:
+            endpoint_stats = self.map_endpoint_stats.setdefault(endpoint, {"n_calls": 0, "n_compressed": 0, "wire_bytes": 0, "body_bytes": 0})
+            endpoint_stats["n_calls"] += 1
+            if content_encoding in ("gzip", "deflate", "br"):
+                endpoint_stats["n_compressed"] += 1
+            endpoint_stats["wire_bytes"] += wire_bytes
+            endpoint_stats["body_bytes"] += body_bytes
+
+    def track(self, endpoint: str, response, stream: bool):
+        # Counts the response when its body is read (stream=False) or when it is closed (stream=True)
+        content_encoding = response.headers.get("Content-Encoding", "identity").lower()
+        if not stream:
+            body_bytes = len(response.content)
+            self.add(endpoint, content_encoding, get_wire_bytes(response, body_bytes), body_bytes)
+            return
+
+        iter_content = response.iter_content
+        close = response.close
+        body_state = {"body_bytes": 0, "tracked": False}
+
+        def counted_iter_content(chunk_size: int = 1, decode_unicode: bool = False):
+            for chunk in iter_content(chunk_size=chunk_size, decode_unicode=decode_unicode):
+                body_state["body_bytes"] += len(chunk)
+                yield chunk
+
+        def tracked_close():
+            if not body_state["tracked"]:
+                body_state["tracked"] = True
+                self.add(endpoint, content_encoding, get_wire_bytes(response, body_state["body_bytes"]), body_state["body_bytes"])
+            close()
+
+        response.iter_content = counted_iter_content
+        response.close = tracked_close
+
+    def get_stats(self):
+        with self.lock:
+            map_stats = dict()
+            for endpoint, endpoint_stats in sorted(self.map_endpoint_stats.items()):
+                map_stats[endpoint] = dict(endpoint_stats)
+                map_stats[endpoint]["ratio"] = round(endpoint_stats["body_bytes"] / max(endpoint_stats["wire_bytes"], 1), 2)
+            return map_stats
+
+
+def get_wire_bytes(response, body_bytes: int):
+    # requests: urllib3 response counts bytes read from the socket; httpx: num_bytes_downloaded
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    num_bytes_downloaded = getattr(response, "num_bytes_downloaded", None)
+    if num_bytes_downloaded is not None:
+        return num_bytes_downloaded
+    return body_bytes
+
+
+def get_endpoint_name(api_path: str):
+    # "/public/core/v3/export/<id>/package?x=1" -> "/public/core/v3/export/{id}/package"
+    path = api_path.split("?", 1)[0]
+    return "/".join("{id}" if re.fullmatch(r"[0-9A-Za-z]{16,}", segment) else segment for segment in path.split("/"))
+
+#########################################################################################
@@ -4,9 +4,20 @@ import sys
 import os
 import time
 import csv
+import re
+import queue
 import logging
+import threading
 
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from ic_client import IcClient
+from ic_rate_limiter import SharedRateLimiter
+from ic_circuit_breaker import CircuitBreaker, CircuitOpenError
+from ic_catalog_cache import ObjectCatalogCache
+from ic_json_stream import iter_json_array_items
+from ic_cassette import HttpCassette
+from ic_job_poller import JobStatusPoller
 
 
 ##########################################################################################
@@ -20,11 +31,24 @@ MODULE_FOLDER = f"{params_collection.get('module_folder')}/CDI_CAI" # <<<
 
 EX_IC_SERVER_URL = params_collection.get('ex_ic_server_url')
 EX_IC_SESSION_ID = params_collection.get('ex_ic_session_id')
+EX_IC_ORG_ID = params_collection.get('ex_ic_org_id')
+EX_IC_TOKEN_CACHE_PATH = params_collection.get('ex_ic_token_cache_path')
+# Local sidecar proxy of the orchestrator (pooled connections to serverUrl), empty - direct calls
+EX_IC_SIDECAR_URL = params_collection.get('ex_ic_sidecar_url')
 
 IM_IC_SERVER_URL = params_collection.get('im_ic_server_url')
 IM_IC_SESSION_ID = params_collection.get('im_ic_session_id')
+IM_IC_TOKEN_CACHE_PATH = params_collection.get('im_ic_token_cache_path')
+IM_IC_SIDECAR_URL = params_collection.get('im_ic_sidecar_url')
+
+# Record / replay of REST traffic (see ic_cassette.py): "record", "replay" or empty
+HTTP_CASSETTE_MODE = params_collection.get('http_cassette_mode')
+HTTP_CASSETTE_FOLDER = params_collection.get('http_cassette_folder')
+HTTP_CASSETTE_SPEED = float(params_collection.get('http_cassette_speed') or 1.0)
 
 CI_CD_SESSION_ID = params_collection.get('ci_cd_session_id')
+# Export batches processed in parallel (1 - export/import pipeline or serial run, see PIPELINE_EXPORT_IMPORT)
+EXPORT_IMPORT_CONCURRENCY = int(params_collection.get('concurrency') or 1)
 CI_CD_DIRECTION = params_collection.get('ci_cd_direction')
 CI_CD_TASK_PATH = f"{MODULE_FOLDER}/ci_cd_task/{CI_CD_DIRECTION}"
 
@@ -40,14 +64,81 @@ LOG_EXPORT_FOLDER = f"{LOG_MODULE_FOLDER}/{MODULE_NAME}/log_export"
 IMPORT_CONFLICT_RESOLUTION = params_collection.get('import_conflict_resolution')
 LOG_IMPORT_FOLDER = f"{LOG_MODULE_FOLDER}/{MODULE_NAME}/log_import"
 
+EXPORT_SESSION_FOLDER = f"{EXPORT_FOLDER}/{CI_CD_SESSION_ID}"
+LOG_EXPORT_SESSION_FOLDER = f"{LOG_EXPORT_FOLDER}/{CI_CD_SESSION_ID}"
+LOG_IMPORT_SESSION_FOLDER = f"{LOG_IMPORT_FOLDER}/{CI_CD_SESSION_ID}"
+
+# Object types for cdi_cai_object_collection (order matters: later types overwrite same path)
+CDI_CAI_OBJECT_TYPES = ['Mapping', 'MTT', 'TASKFLOW', 'AI_SERVICE_CONNECTOR', 'PROCESS', 'AI_CONNECTION']
+# "Type" column of ci_cd_task (lower case) -> object type of the API, API type names are accepted too
+CDI_CAI_OBJECT_TYPE_BY_LABEL = {
+    "mapping": "Mapping",
+    "mapping task": "MTT",
+    "taskflow": "TASKFLOW",
+    "service connector": "AI_SERVICE_CONNECTOR",
+    "process": "PROCESS",
+    "app connector": "AI_CONNECTION",
+    "app connection": "AI_CONNECTION",
+    **{type.lower(): type for type in CDI_CAI_OBJECT_TYPES}
+}
+CATALOG_MAX_WORKERS = 6
+CATALOG_PAGE_LIMIT = 200
+CATALOG_STREAM_CHUNK_SIZE = 64 * 1024
+CATALOG_CACHE_FOLDER = f"{MODULE_FOLDER}/catalog_cache"
+CATALOG_CACHE_TTL_SEC = 12 * 60 * 60
+# Targeted resolution (query only folders from ci_cd_task) is used while
+# number of queries (distinct type and folder pairs of ci_cd_task) is not bigger than this threshold
+TARGETED_RESOLUTION_MAX_QUERIES = 60
+# Token bucket per environment for all REST calls: calls per second and burst.
+# The bucket is shared by all module processes calling the same serverUrl (state in RATE_LIMIT_QUOTA_FOLDER)
+RATE_LIMIT_PER_SEC = 5.0
+RATE_LIMIT_BURST = 10
+RATE_LIMIT_QUOTA_FOLDER = f"{LOG_MODULE_FOLDER}/rate_limit_quota"
+# Circuit breaker per environment: opens after N failures in a row, blocks calls for N sec.
+# On open circuit the object is paused and repeated ("pause") or the module is stopped ("abort")
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_OPEN_SEC = 60
+CIRCUIT_BREAKER_ON_OPEN = "pause"
+CIRCUIT_BREAKER_MAX_PAUSES = 5
+# Objects per export job, opt-in (1 - one export job and package per object). A batch has one package
+# batch_<b>-<session>.zip, its export / import logs are also split per object: ex_<object>-<session>.txt, im_<object>-<session>.txt.
+# One object which can not be exported fails the export job of the whole batch
+EXPORT_BATCH_SIZE = 1
+# One import job for all exported objects of a batch (includeObjects), results are split back per object, opt-in.
+# False - the package is uploaded and imported once per object
+IMPORT_BATCH_OBJECTS = False
+# Exports of next batches run while the previous batches are imported, opt-in (False - export and import one after another).
+# Max number of exported batches waiting for import
+PIPELINE_EXPORT_IMPORT = False
+PIPELINE_QUEUE_SIZE = 2
+# With EXPORT_IMPORT_CONCURRENCY > 1 import jobs are started in the order of ci_cd_task (dependencies first):
+# a batch is imported after the import of the previous batch is finished. False - imports run in parallel too
+IMPORT_IN_ORDER = True
+# Object names found more than once in ci_cd_task (see get_object_job_name)
+DUPLICATE_OBJECT_NAMES = set()
+# Status of all export and import jobs is checked by one poller thread (started on the first job),
+# checks run on JOB_POLLER_MAX_WORKERS threads; a job fails after JOB_POLLER_MAX_FAILURES failed checks in a row
+JOB_POLLER_MAX_WORKERS = 4
+JOB_POLLER_MAX_FAILURES = 5
+job_status_poller = JobStatusPoller("job_poller", JOB_POLLER_MAX_WORKERS, JOB_POLLER_MAX_FAILURES)
+# Parallel range segments for export packages of SEGMENTED_DOWNLOAD_MIN_SIZE and more (ic_client.py), opt-in:
+# every package then costs one more Range probe request. 1 - single stream
+DOWNLOAD_SEGMENTS = 1
+# HTTP/2 transport (httpx[http2] is required): concurrent calls share one multiplexed connection per environment
+HTTP2_TRANSPORT = False
+
 ##### set up logging #####
+# Batch / object processed by the thread (set_log_context), parallel workers write to the same log
+log_context = threading.local()
+
 class SafeExtraFormatter(logging.Formatter):
     def format(self, record):
         if not hasattr(record, 'module_name'):
             record.module_name = ''
+        record.object_context = getattr(log_context, 'value', '')
         return super().format(record)
     
-logFormatter = SafeExtraFormatter("%(module_name)s  %(asctime)s [%(threadName)-12.12s] [%(levelname)-7.5s] %(message)s")
+logFormatter = SafeExtraFormatter("%(module_name)s  %(asctime)s [%(threadName)-12.12s] [%(levelname)-7.5s] %(object_context)s%(message)s")
 rootLogger = logging.getLogger()
 rootLogger.setLevel(logging.DEBUG)
 
@@ -87,43 +178,113 @@ def get_object_list_to_export(ci_cd_task_path: str):
     return list_object
 
 
-def get_all_objects_by_type(server_url: str, session_id: str, type: str):
-    api_url = server_url + f"/public/core/v3/objects?q=type=='{type}'"
-    headers = {
-        "INFA-SESSION-ID": session_id
-    }
-    response = requests.get(api_url, headers=headers)
+def get_object_location(row: list):
+    # Folder from ci_cd_task can be written with "\" (Excel), IICS paths use "/"
+    return row[2].replace("\\", "/")
 
-    list_of_objects = dict()
-    if response.status_code == 200:
-        list_of_objects = json.loads(response.content)
-        return list_of_objects
-    else:
-        print(f"Error {response.status_code}: {response.text}")
-        return list_of_objects
 
+def get_object_path(row: list):
+    return f"{get_object_location(row)}/{row[3]}"
+
+
+def get_object_types(row: list):
+    # API types of the object from the "Type" column, all CDI_CAI_OBJECT_TYPES if the label is unknown
+    type = CDI_CAI_OBJECT_TYPE_BY_LABEL.get(row[1].strip().lower())
+    if type is None:
+        return CDI_CAI_OBJECT_TYPES
+    return [type]
+
+
+def get_targeted_queries(list_row: list):
+    # Distinct (type, location) pairs of ci_cd_task, in the order of CDI_CAI_OBJECT_TYPES
+    set_query = {(type, get_object_location(row)) for row in list_row for type in get_object_types(row)}
+    return sorted(set_query, key=lambda query: (CDI_CAI_OBJECT_TYPES.index(query[0]), query[1]))
+
+
+def get_all_objects_by_type(ic_client: IcClient, type: str, extra_query: str = "", page_limit: int = CATALOG_PAGE_LIMIT):
+    # Generator: walks the catalog page by page (limit/skip) and yields objects as they arrive,
+    # every page is parsed incrementally from the response stream (objects[*] one by one),
+    # so neither the page body nor the whole document tree is kept in memory
+    # extra_query - additional condition for q, e.g. " and updateTime>'2025-05-01T00:00:00Z'"
+    skip = 0
+    while True:
+        with ic_client.get(f"/public/core/v3/objects?q=type=='{type}'{extra_query}&limit={page_limit}&skip={skip}", stream=True) as response:
+            if response.status_code != 200:
+                rootLogger.error(f"Error {response.status_code}: {response.text}")
+                raise Exception(f"Error {response.status_code}: {response.text}")
+
+            page_values = dict()
+            n_page_objects = 0
+            for obj in iter_json_array_items(response.iter_content(chunk_size=CATALOG_STREAM_CHUNK_SIZE), "objects", page_values):
+                n_page_objects += 1
+                yield obj
 
-def create_object_collection(source_object_list: str):
-    object_collection = {obj["path"]: obj["id"] for obj in source_object_list["objects"]}
+        total_count = page_values.get("count")
+        rootLogger.debug(f">> [{type}] page skip={skip}: {n_page_objects} objects (count: {total_count})")
+        skip += n_page_objects
+        if n_page_objects < page_limit or (total_count is not None and skip >= total_count):
+            break
+
+
+def create_object_collection(source_object_list):
+    # source_object_list - any iterable of objects, e.g. get_all_objects_by_type(...)
+    object_collection = dict()
+    for obj in source_object_list:
+        object_collection[obj["path"]] = obj["id"]
     return object_collection
 
 
-def create_export_job(server_url: str, session_id: str, job_name: str, object_id: str):
-    api_url = server_url + "/public/core/v3/export"
-    headers = {
-        "Content-Type": "application/json",
-        "INFA-SESSION-ID": session_id
-    }
+def create_object_collection_by_types(ic_client: IcClient, list_type: list, max_workers: int = CATALOG_MAX_WORKERS,
+                                      catalog_cache: ObjectCatalogCache = None):
+    # Download catalogs of all types in parallel, merge them in the order of list_type
+    # so the result is the same as sequential create_object_collection + update
+    # If catalog_cache is set, collections are served from the local cache (with incremental refresh)
+    def create_type_collection(type: str):
+        if catalog_cache is not None:
+            return catalog_cache.get_object_collection(type)
+        return create_object_collection(get_all_objects_by_type(ic_client, type))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="catalog") as executor:
+        list_collection_by_type = list(executor.map(create_type_collection, list_type))
+
+    object_collection = dict()
+    for type, type_collection in zip(list_type, list_collection_by_type):
+        rootLogger.info(f"(3) add {type}: {len(type_collection)} objects")
+        object_collection.update(type_collection)
+    return object_collection
+
+
+def create_object_collection_by_locations(ic_client: IcClient, list_query: list, max_workers: int = CATALOG_MAX_WORKERS):
+    # Targeted resolution: query only the folders (locations) listed in ci_cd_task,
+    # one query per (type, location) pair of list_query (get_targeted_queries), all queries run in parallel.
+    # Collections are merged in the order of list_query, the same way as create_object_collection_by_types
+
+    def create_query_collection(query: tuple):
+        type, location = query
+        return create_object_collection(get_all_objects_by_type(ic_client, type, f" and location=='{location}'"))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="catalog") as executor:
+        list_collection_by_query = list(executor.map(create_query_collection, list_query))
+
+    object_collection = dict()
+    for query_collection in list_collection_by_query:
+        object_collection.update(query_collection)
+    rootLogger.info(f"(3) targeted resolution: {len(list_query)} queries, {len(object_collection)} objects")
+    return object_collection
+
+
+def create_export_job(ic_client: IcClient, job_name: str, list_object_id: list):
+    # One export job (and one package) for all objects of list_object_id
     payload = {
         "name": job_name,
         "objects": [
             {
                 "id": object_id,
                 "includeDependencies": False
-            }
+            } for object_id in list_object_id
         ]
     }
-    response = requests.post(api_url, headers=headers, json=payload)
+    response = ic_client.post("/public/core/v3/export", json=payload)
 
     if response.status_code == 200:
         data = json.loads(response.content)
@@ -134,12 +295,10 @@ def create_export_job(server_url: str, session_id: str, job_name: str, object_id
         return 0
 
 
-def check_export_job_status(server_url: str, session_id: str, export_id):
-    api_url = server_url + "/public/core/v3/export/" + export_id
-    headers = {
-        "INFA-SESSION-ID": session_id
-    }
-    response = requests.get(api_url, headers=headers)
+def check_export_job_status(ic_client: IcClient, export_id, retry: bool = True):
+    # retry=False - one call without the retry policy (the job poller repeats a failed check in its next round)
+    api_path = "/public/core/v3/export/" + export_id
+    response = ic_client.get(api_path) if retry else ic_client.request_once("GET", api_path)
 
     export_status = ""
     if response.status_code == 200:
@@ -152,39 +311,46 @@ def check_export_job_status(server_url: str, session_id: str, export_id):
     return export_status
 
 
-def load_export_package(server_url: str, session_id: str, export_id: str, export_to_import_path: str):
+def get_export_object_status(ic_client: IcClient, export_id: str):
+    # Status of every object of the export job: {object_id: (state, message)}
+    response = ic_client.get("/public/core/v3/export/" + export_id + "?expand=objects")
+
+    if response.status_code == 200:
+        data = json.loads(response.content)
+        return {obj['id']: (obj['status']['state'], obj['status'].get('message', '')) for obj in data.get('objects', [])}
+    else:
+        rootLogger.error(f"Error {response.status_code}: {response.text}")
+        return dict()
+
+
+def load_export_package(ic_client: IcClient, export_id: str, export_to_import_path: str):
+    export_folder = os.path.dirname(export_to_import_path)
     if not os.path.exists(export_folder):
-        os.makedirs(export_folder)
+        os.makedirs(export_folder, exist_ok=True)
         rootLogger.info(f">> Export directory created: {export_folder}")
 
-    api_url = server_url + "/public/core/v3/export/" + export_id + "/package"
-    headers = {
-        "INFA-SESSION-ID": session_id
-    }
-    response = requests.get(api_url, headers=headers)
+    try:
+        status_code, n_bytes = ic_client.download("/public/core/v3/export/" + export_id + "/package", export_to_import_path,
+                                                  n_segments=DOWNLOAD_SEGMENTS)
+    except requests.exceptions.RequestException as e:
+        rootLogger.error(f"[X] Error: download is broken: {e}")
+        return 0
 
-    if response.status_code == 200:
-        with open(export_to_import_path, "wb") as f:
-            f.write(response.content)
+    if status_code in (200, 206):
         rootLogger.info(f"[V] Package saved successfully in path '{export_to_import_path}'")
         return 1
     else:
-        rootLogger.error(f"[X] Error: status {response.status_code}")
-        rootLogger.error(response.text)
+        rootLogger.error(f"[X] Error: status {status_code}")
         return 0
 
 
-def load_export_log(server_url: str, session_id: str, export_id: str, log_folder: str, log_file: str):
+def load_export_log(ic_client: IcClient, export_id: str, log_folder: str, log_file: str):
     if not os.path.exists(log_folder):
-        os.makedirs(log_folder)
+        os.makedirs(log_folder, exist_ok=True)
         rootLogger.info(f">> Export Log directory created: {log_folder}")
     log_path = f"{log_folder}/{log_file}"
 
-    api_url = server_url + "/public/core/v3/export/" + export_id + "/log"
-    headers = {
-        "INFA-SESSION-ID": session_id
-    }
-    response = requests.get(api_url, headers=headers)
+    response = ic_client.get("/public/core/v3/export/" + export_id + "/log")
 
     if response.status_code == 200:
         with open(log_path, "wb") as f:
@@ -202,15 +368,9 @@ def load_export_log(server_url: str, session_id: str, export_id: str, log_folder
 
 # IMPORT UTILS ###########################################################################
 
-def upload_import_package(server_url: str, session_id: str, export_to_import_path: str):
-    api_url = server_url + "/public/core/v3/import/package"
-    headers = {
-        "INFA-SESSION-ID": session_id
-    }
+def upload_import_package(ic_client: IcClient, export_to_import_path: str):
     rootLogger.info(f"export_to_import_path: {export_to_import_path}")
-    with open(export_to_import_path, "rb") as f:
-        files = {"package": (export_to_import_path, f)}
-        response = requests.post(api_url, headers=headers, files=files)
+    response = ic_client.upload("/public/core/v3/import/package", "package", export_to_import_path)
 
     import_job_id = 0
     if response.status_code in (200, 201):
@@ -223,12 +383,7 @@ def upload_import_package(server_url: str, session_id: str, export_to_import_pat
     return import_job_id
     
 
-def create_import_job(server_url: str, session_id: str,  ic_import_job_id: str, import_job_name: str, list_object_id: list, conflict_resolution: str):
-    api_url = server_url + "/public/core/v3/import/" + ic_import_job_id
-    headers = {
-        "Content-Type": "application/json",
-        "INFA-SESSION-ID": session_id
-    }
+def create_import_job(ic_client: IcClient, ic_import_job_id: str, import_job_name: str, list_object_id: list, conflict_resolution: str):
     payload = {   
         "name" : import_job_name,
         "importSpecification" : {
@@ -239,7 +394,7 @@ def create_import_job(server_url: str, session_id: str,  ic_import_job_id: str,
         }
     }
 
-    response = requests.post(api_url, headers=headers, json=payload)
+    response = ic_client.post("/public/core/v3/import/" + ic_import_job_id, json=payload)
 
     import_status = ""
     if response.status_code == 200:
@@ -252,12 +407,10 @@ def create_import_job(server_url: str, session_id: str,  ic_import_job_id: str,
         return import_status
 
 
-def check_import_job_status(server_url: str, session_id: str, import_id):
-    api_url = server_url + "/public/core/v3/import/" + import_id
-    headers = {
-        "INFA-SESSION-ID": session_id
-    }
-    response = requests.get(api_url, headers=headers)
+def check_import_job_status(ic_client: IcClient, import_id, retry: bool = True):
+    # retry=False - one call without the retry policy (the job poller repeats a failed check in its next round)
+    api_path = "/public/core/v3/import/" + import_id
+    response = ic_client.get(api_path) if retry else ic_client.request_once("GET", api_path)
 
     status = ""
     if response.status_code == 200:
@@ -270,17 +423,13 @@ def check_import_job_status(server_url: str, session_id: str, import_id):
     return status
 
 
-def load_import_log(server_url: str, session_id: str, export_id: str, log_folder: str, log_file: str):
+def load_import_log(ic_client: IcClient, export_id: str, log_folder: str, log_file: str):
     if not os.path.exists(log_folder):
-        os.makedirs(log_folder)
+        os.makedirs(log_folder, exist_ok=True)
         rootLogger.info(f">> Import Log directory created: {log_folder}")
     log_path = f"{log_folder}/{log_file}"
 
-    api_url = server_url + "/public/core/v3/import/" + export_id + "/log"
-    headers = {
-        "INFA-SESSION-ID": session_id
-    }
-    response = requests.get(api_url, headers=headers)
+    response = ic_client.get("/public/core/v3/import/" + export_id + "/log")
 
     if response.status_code == 200:
         with open(log_path, "wb") as f:
@@ -291,6 +440,409 @@ def load_import_log(server_url: str, session_id: str, export_id: str, log_folder
         rootLogger.info(f"[X] Error: status {response.status_code}")
         rootLogger.info(response.text)
         return 0   
+
+
+def get_import_object_status(ic_client: IcClient, import_id: str):
+    # Status of every object of the import job: {source object id: (state, message)}
+    response = ic_client.get("/public/core/v3/import/" + import_id + "?expand=objects")
+
+    if response.status_code == 200:
+        data = json.loads(response.content)
+        return {obj['sourceObject']['id']: (obj['status']['state'], obj['status'].get('message', ''))
+                for obj in data.get('objects', [])}
+    else:
+        rootLogger.error(f"Error {response.status_code}: {response.text}")
+        return dict()
+
+
+#########################################################################################  
+
+
+# EXPORT - IMPORT OF ONE BATCH OF OBJECTS ################################################
+
+def get_object_job_name(k: int, ic_object_name: str):
+    # Name of jobs, package and log files of the object: <ic_object_name>-<CI_CD_SESSION_ID>,
+    # objects with the same name (in different folders) get their number, so their files do not collide
+    if ic_object_name in DUPLICATE_OBJECT_NAMES:
+        return f"{ic_object_name}_{k}-{CI_CD_SESSION_ID}"
+    return f"{ic_object_name}-{CI_CD_SESSION_ID}"
+
+
+def get_batch_job_name(b: int, list_object: list):
+    # Batch of one object keeps the names of the object
+    if len(list_object) == 1:
+        return get_object_job_name(list_object[0][0], list_object[0][2])
+    return f"batch_{b}-{CI_CD_SESSION_ID}"
+
+
+def is_object_log_line(line: str, ic_object_path: str, ic_object_id: str):
+    # The line names the object by id or by full path (not by a longer path starting with it)
+    return ic_object_id in line or re.search(re.escape(ic_object_path) + r"(?![\w.-])", line) is not None
+
+
+def split_batch_log(batch_log_path: str, list_object: list, log_folder: str, log_prefix: str):
+    # Per-object logs (<log_prefix>_<object job name>.txt) from the log of a batch export / import job:
+    # lines about the other objects of the batch are dropped, common lines (job header, summary) are kept in every log
+    with open(batch_log_path, encoding="utf-8", errors="replace") as f:
+        list_line = f.read().splitlines()
+    for k, ic_object_path, ic_object_name, ic_object_id in list_object:
+        list_other_object = [obj for obj in list_object if obj[0] != k]
+        list_object_line = [line for line in list_line
+                            if not any(is_object_log_line(line, obj[1], obj[3]) for obj in list_other_object)]
+        log_path = f"{log_folder}/{log_prefix}_{get_object_job_name(k, ic_object_name)}.txt"
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(list_object_line))
+        rootLogger.info(f"[V] Log of {ic_object_path} saved successfully in path '{log_path}'")
+
+
+def set_log_context(b: int, list_object: list):
+    # Every log line of the current thread starts with the batch / object it works on (empty list - no context)
+    if not list_object:
+        log_context.value = ""
+    elif len(list_object) == 1:
+        log_context.value = f"[{list_object[0][0]}: {list_object[0][2]}] "
+    else:
+        log_context.value = f"[b{b}: {list_object[0][2]}..{list_object[-1][2]}] "
+
+
+def submit_job_status_check(label: str, check_status, terminal_states: tuple, pause_sec: float, max_polls: int):
+    # Status checks run in poller threads: the log context of the submitting thread is kept for the check
+    # and for the lines of the poller (label)
+    context = getattr(log_context, 'value', '')
+
+    def check_status_in_context():
+        log_context.value = context
+        try:
+            return check_status()
+        finally:
+            log_context.value = ""
+
+    return job_status_poller.submit(f"{context}{label}", check_status_in_context, terminal_states, pause_sec, max_polls)
+
+
+def export_batch(b: int, list_object: list, ex_ic_client: IcClient):
+    # Steps 5-8 for a batch of objects (k, ic_object_path, ic_object_name, ic_object_id): one export job, one package.
+    # Returns path of the package (None - package is not loaded) and {k: True if the object is in the package}
+    for k, ic_object_path, ic_object_name, ic_object_id in list_object:
+        adapterLogger.info(f"\n(5.{k}) >> batch: {b} | ic_object_path: {ic_object_path} | ic_object_name: {ic_object_name} | ic_object_id: {ic_object_id}")
+
+    export_job_name = get_batch_job_name(b, list_object)
+    adapterLogger.info(f"\n(5.b{b}) >> export_job_name: {export_job_name} | objects: {len(list_object)}")
+    ic_export_job_id = create_export_job(ex_ic_client, export_job_name, [obj[3] for obj in list_object])
+    adapterLogger.info(f"(5.b{b}) >> ic_export_job_id: {ic_export_job_id}")
+    if ic_export_job_id == 0:
+        adapterLogger.error(f"(5.b{b}) [Error]: Export Job was not created, objects are skipped: {[obj[1] for obj in list_object]}")
+        return None, {obj[0]: False for obj in list_object}
+
+    # === 6. Checking Export Job status ===
+    adapterLogger.info(f"\n===  6.b{b} Checking Export Job status ===")
+    # X checks with pause in N sec, done by the poller together with the checks of all other jobs
+    n_attempts = 11
+    pause_sec = 3
+    status_future = submit_job_status_check(f"(6.b{b}) export job {ic_export_job_id}",
+                                            lambda: check_export_job_status(ex_ic_client, ic_export_job_id, retry=False),
+                                            ("SUCCESSFUL", "FAILED"), pause_sec, n_attempts - 1)
+    ic_export_job_status = status_future.result()
+    adapterLogger.info(f"(6.b{b}) >> ic_export_job_status: {ic_export_job_status}")
+
+    export_file = f"{export_job_name}.zip"
+    export_to_import_path = f"{EXPORT_SESSION_FOLDER}/{export_file}"
+    package_status = 0
+    if ic_export_job_status == "SUCCESSFUL":
+        # === 7. Load Export Package ===
+        adapterLogger.info(f"\n===  7.b{b} Load Export Package ===")
+        package_status = load_export_package(ex_ic_client, ic_export_job_id, export_to_import_path)
+        if package_status == 1:
+            adapterLogger.info(f"(7.b{b}) -=[~+~] Package exported successfully [~+~]=-")
+        else:
+            adapterLogger.error(f"(7.b{b}) >> Some error occurred during export... ")
+    else:
+        adapterLogger.warning(f" (7.b{b}) >> Please check Export Job status later or repeat it...")
+
+    # === 8. Load Export Package ===
+    adapterLogger.info(f"\n===  8.b{b} Load Export Package Log ===")
+    log_export_file = f"ex_{export_job_name}.txt"
+    status = load_export_log(ex_ic_client, ic_export_job_id, LOG_EXPORT_SESSION_FOLDER, log_export_file)
+    if status == 1:
+        adapterLogger.info(f"(8.b{b}) [+] Export log saved")
+        if len(list_object) > 1:
+            split_batch_log(f"{LOG_EXPORT_SESSION_FOLDER}/{log_export_file}", list_object, LOG_EXPORT_SESSION_FOLDER, "ex")
+    else:
+        adapterLogger.error(f"(8.b{b}) >> Some error occurred during log saving ... ")
+
+    # Status of the job is the status of every object, unless the job reports objects one by one
+    map_object_status = dict()
+    if len(list_object) > 1:
+        map_object_status = get_export_object_status(ex_ic_client, ic_export_job_id)
+    map_exported = dict()
+    for k, ic_object_path, ic_object_name, ic_object_id in list_object:
+        object_state, object_message = map_object_status.get(ic_object_id, (ic_export_job_status, ""))
+        map_exported[k] = package_status == 1 and object_state == "SUCCESSFUL"
+        adapterLogger.info(f"(8.{k}) >> export status: {object_state} {object_message} | {ic_object_path}")
+
+    adapterLogger.info("==========================================================")
+    if package_status != 1:
+        return None, map_exported
+    return export_to_import_path, map_exported
+
+
+def import_object(k: int, ic_object_path: str, ic_object_name: str, ic_object_id: str, export_to_import_path: str,
+                  im_ic_client: IcClient):
+    # Steps 9-12 for one object of the package, returns True if the object is imported
+    # === 9. Upload Import Package === 
+    adapterLogger.info(f"\n=== 9.{k} Upload Import Package === ")
+    ic_import_job_id = upload_import_package(im_ic_client, export_to_import_path)
+    adapterLogger.info(f"(9.{k}) ic_import_job_id: {ic_import_job_id}")
+    if ic_import_job_id == 0:
+        raise Exception(f"(9.{k}) [Error]: ic_import_job_id is invalid, please check logs")
+
+    # === 10. Create Import Job ===
+    adapterLogger.info(f"\n=== 10.{k} Create Import Job ===")
+    import_job_name = get_object_job_name(k, ic_object_name)
+    list_object_id = [ic_object_id]
+
+    ic_import_job_status = create_import_job(im_ic_client, ic_import_job_id, import_job_name, list_object_id, IMPORT_CONFLICT_RESOLUTION)
+    adapterLogger.info(f"(10.{k}) ic_import_job_status: {ic_import_job_status}")
+    
+    # === 11. Checking Import Job status ===
+    adapterLogger.info(f"\n=== 11.{k} Checking Import Job status ===")
+    # X checks with pause in N sec, done by the poller together with the checks of all other jobs
+    n_attempts = 15
+    pause_sec = 3
+    status_future = submit_job_status_check(f"(11.{k}) import job {ic_import_job_id}",
+                                            lambda: check_import_job_status(im_ic_client, ic_import_job_id, retry=False),
+                                            ("SUCCESSFUL", "FAILED"), pause_sec, n_attempts - 1)
+    ic_import_job_status = status_future.result()
+    adapterLogger.info(f"(11.{k}) >> ic_import_job_status: {ic_import_job_status}")
+    
+    if ic_import_job_status == "SUCCESSFUL":
+        # === 12. Load Import  Log  ===
+        adapterLogger.info(f"\n=== 12.{k} Load Import  Log ===")
+        log_import_file = f"im_{get_object_job_name(k, ic_object_name)}.txt"
+        status = load_import_log(im_ic_client, ic_import_job_id, LOG_IMPORT_SESSION_FOLDER, log_import_file)
+        if status == 1:
+            adapterLogger.info(f"(12.{k}) [+] Import log saved")
+        else:
+            adapterLogger.error(f"(12.{k}) >> Some error occurred during log saving ... ") 
+        return True
+    else:
+        adapterLogger.warning(f" (12.{k}) >> Please check Import Job status later or repeat it...")
+        return False
+
+
+def import_batch(b: int, list_object: list, export_to_import_path: str, im_ic_client: IcClient):
+    # Steps 9-12 for a batch of objects: one upload of the package, one import job for all objects.
+    # Returns {k: True if the object is imported}
+    # === 9. Upload Import Package === 
+    adapterLogger.info(f"\n=== 9.b{b} Upload Import Package === ")
+    ic_import_job_id = upload_import_package(im_ic_client, export_to_import_path)
+    adapterLogger.info(f"(9.b{b}) ic_import_job_id: {ic_import_job_id}")
+    if ic_import_job_id == 0:
+        raise Exception(f"(9.b{b}) [Error]: ic_import_job_id is invalid, please check logs")
+
+    # === 10. Create Import Job ===
+    adapterLogger.info(f"\n=== 10.b{b} Create Import Job ===")
+    import_job_name = get_batch_job_name(b, list_object)
+    list_object_id = [obj[3] for obj in list_object]
+
+    ic_import_job_status = create_import_job(im_ic_client, ic_import_job_id, import_job_name, list_object_id, IMPORT_CONFLICT_RESOLUTION)
+    adapterLogger.info(f"(10.b{b}) ic_import_job_status: {ic_import_job_status} | objects: {len(list_object_id)}")
+
+    # === 11. Checking Import Job status ===
+    adapterLogger.info(f"\n=== 11.b{b} Checking Import Job status ===")
+    # X checks with pause in N sec (by the poller), a batch job can also end PARTIAL (some objects failed)
+    n_attempts = 15
+    pause_sec = 3
+    status_future = submit_job_status_check(f"(11.b{b}) import job {ic_import_job_id}",
+                                            lambda: check_import_job_status(im_ic_client, ic_import_job_id, retry=False),
+                                            ("SUCCESSFUL", "PARTIAL", "FAILED"), pause_sec, n_attempts - 1)
+    ic_import_job_status = status_future.result()
+    adapterLogger.info(f"(11.b{b}) >> ic_import_job_status: {ic_import_job_status}")
+
+    if ic_import_job_status not in ("SUCCESSFUL", "PARTIAL", "FAILED"):
+        adapterLogger.warning(f" (12.b{b}) >> Please check Import Job status later or repeat it...")
+        return {obj[0]: False for obj in list_object}
+
+    # === 12. Load Import  Log  ===
+    adapterLogger.info(f"\n=== 12.b{b} Load Import  Log ===")
+    log_import_file = f"im_{import_job_name}.txt"
+    status = load_import_log(im_ic_client, ic_import_job_id, LOG_IMPORT_SESSION_FOLDER, log_import_file)
+    if status == 1:
+        adapterLogger.info(f"(12.b{b}) [+] Import log saved")
+        if len(list_object) > 1:
+            split_batch_log(f"{LOG_IMPORT_SESSION_FOLDER}/{log_import_file}", list_object, LOG_IMPORT_SESSION_FOLDER, "im")
+    else:
+        adapterLogger.error(f"(12.b{b}) >> Some error occurred during log saving ... ")
+
+    # Status of the job is the status of every object, unless the job reports objects one by one
+    map_object_status = dict()
+    if len(list_object) > 1:
+        map_object_status = get_import_object_status(im_ic_client, ic_import_job_id)
+    map_imported = dict()
+    for k, ic_object_path, ic_object_name, ic_object_id in list_object:
+        object_state, object_message = map_object_status.get(ic_object_id, (ic_import_job_status, ""))
+        map_imported[k] = object_state == "SUCCESSFUL"
+        if map_imported[k]:
+            adapterLogger.info(f"(12.{k}) >> import status: {object_state} | {ic_object_path}")
+        else:
+            adapterLogger.error(f"(12.{k}) >> import status: {object_state} {object_message} | {ic_object_path}")
+    return map_imported
+
+
+def import_exported_objects(b: int, list_object: list, export_to_import_path: str, map_exported: dict,
+                            im_ic_client: IcClient, map_imported: dict):
+    # Steps 9-12 for the exported objects of a batch which are not imported yet,
+    # map_imported is filled with {k: True if the object is imported}
+    list_exported_object = []
+    for k, ic_object_path, ic_object_name, ic_object_id in list_object:
+        if k in map_imported:
+            continue
+        if map_exported[k]:
+            list_exported_object.append((k, ic_object_path, ic_object_name, ic_object_id))
+        else:
+            adapterLogger.error(f"(9.{k}) [Error]: Object was not exported, import is skipped: {ic_object_path}")
+            map_imported[k] = False
+    if not list_exported_object:
+        return map_imported
+
+    if IMPORT_BATCH_OBJECTS:
+        map_imported.update(import_batch(b, list_exported_object, export_to_import_path, im_ic_client))
+        return map_imported
+    for k, ic_object_path, ic_object_name, ic_object_id in list_exported_object:
+        map_imported[k] = import_object(k, ic_object_path, ic_object_name, ic_object_id, export_to_import_path, im_ic_client)
+    return map_imported
+
+
+def run_paused_on_open_circuit(step: str, function, *args):
+    # While a circuit is open the step waits until the breaker lets a probe call through
+    # and is repeated from the start, or the module is stopped (CIRCUIT_BREAKER_ON_OPEN)
+    n_pauses = 0
+    while True:
+        try:
+            return function(*args)
+        except CircuitOpenError as e:
+            n_pauses += 1
+            if CIRCUIT_BREAKER_ON_OPEN == "abort" or n_pauses > CIRCUIT_BREAKER_MAX_PAUSES:
+                adapterLogger.error(f"({step}) [Error]: {e} | module is stopped")
+                raise Exception(f"({step}) [Error]: IICS environment is not available: {e}") from e
+            adapterLogger.warning(f"({step}) >> {e} | batch is paused ({n_pauses}/{CIRCUIT_BREAKER_MAX_PAUSES}) and will be repeated")
+            time.sleep(e.retry_in_sec)
+
+
+def process_batch(b: int, list_object: list, ex_ic_client: IcClient, im_ic_client: IcClient):
+    # Steps 5-12 for a batch of objects, returns {k: True if the object is imported}
+    set_log_context(b, list_object)
+    export_to_import_path, map_exported = run_paused_on_open_circuit(f"5.b{b}", export_batch, b, list_object, ex_ic_client)
+    return run_paused_on_open_circuit(f"9.b{b}", import_exported_objects, b, list_object, export_to_import_path, map_exported,
+                                      im_ic_client, dict())
+
+#########################################################################################  
+
+
+# EXPORT - IMPORT PIPELINE ###############################################################
+
+def put_pipeline_item(export_queue: queue.Queue, item, stop_event: threading.Event):
+    # Waits for a free place in the bounded queue, gives up when the import stage is stopped
+    while not stop_event.is_set():
+        try:
+            export_queue.put(item, timeout=1)
+            return
+        except queue.Full:
+            pass
+
+
+def run_export_stage(list_batch: list, ex_ic_client: IcClient, export_queue: queue.Queue, stop_event: threading.Event):
+    # Producer: exports batches in the order of ci_cd_task and puts (b, list_object, export_to_import_path, map_exported)
+    # in the queue. The last item is None (all batches are exported) or the exception which stopped the stage
+    try:
+        for b, list_object in enumerate(list_batch, start=1):
+            if stop_event.is_set():
+                return
+            set_log_context(b, list_object)
+            export_to_import_path, map_exported = run_paused_on_open_circuit(f"5.b{b}", export_batch, b, list_object, ex_ic_client)
+            put_pipeline_item(export_queue, (b, list_object, export_to_import_path, map_exported), stop_event)
+        put_pipeline_item(export_queue, None, stop_event)
+    except Exception as e:
+        adapterLogger.error(f"(5) [Error]: export stage is stopped: {e}")
+        put_pipeline_item(export_queue, e, stop_event)
+
+
+def run_pipeline(list_batch: list, ex_ic_client: IcClient, im_ic_client: IcClient):
+    # DEV exports run in the export stage thread while QA imports are done here (consumer).
+    # Batches are imported one by one in the order of ci_cd_task (dependencies first), a batch is imported
+    # only after its export. The export stage waits while PIPELINE_QUEUE_SIZE exported batches are not imported
+    export_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    stop_event = threading.Event()
+    export_thread = threading.Thread(target=run_export_stage, args=(list_batch, ex_ic_client, export_queue, stop_event),
+                                     name="export_stage", daemon=True)
+    export_thread.start()
+
+    map_imported = dict()
+    try:
+        while True:
+            item = export_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            b, list_object, export_to_import_path, map_exported = item
+            set_log_context(b, list_object)
+            adapterLogger.info(f"(9.b{b}) >> import of batch {b} | exported batches waiting: {export_queue.qsize()}")
+            run_paused_on_open_circuit(f"9.b{b}", import_exported_objects, b, list_object, export_to_import_path, map_exported,
+                                       im_ic_client, map_imported)
+    finally:
+        # import error: export stage stops after the current batch
+        stop_event.set()
+        export_thread.join()
+    return map_imported
+
+#########################################################################################  
+
+
+# EXPORT - IMPORT WORKER POOL ############################################################
+
+def run_worker_pool(list_batch: list, ex_ic_client: IcClient, im_ic_client: IcClient, concurrency: int):
+    # Every worker runs steps 5-12 of one batch, at most `concurrency` batches are in flight.
+    # With IMPORT_IN_ORDER a batch waits after its export until the import of the previous batch is finished
+    # (batches are taken in the order of ci_cd_task, so the previous batch is always running or done).
+    # After a batch fails (error, not a failed object) no other batch or import is started, so objects are not imported
+    # without the dependencies of the failed batch; import jobs already started in the target are finished
+    list_import_done = [threading.Event() for _ in list_batch]
+    batch_failed = threading.Event()
+
+    def run_batch(b: int, list_object: list):
+        set_log_context(b, list_object)
+        try:
+            if batch_failed.is_set():
+                adapterLogger.error(f"(5.b{b}) [Error]: batch is skipped, another batch failed: {[obj[1] for obj in list_object]}")
+                return {obj[0]: False for obj in list_object}
+            export_to_import_path, map_exported = run_paused_on_open_circuit(f"5.b{b}", export_batch, b, list_object, ex_ic_client)
+            if IMPORT_IN_ORDER and b > 1 and not list_import_done[b - 2].is_set():
+                adapterLogger.info(f"(9.b{b}) >> waiting for the import of batch {b - 1}")
+                list_import_done[b - 2].wait()
+            if batch_failed.is_set():
+                adapterLogger.error(f"(9.b{b}) [Error]: import is skipped, another batch failed: {[obj[1] for obj in list_object]}")
+                return {obj[0]: False for obj in list_object}
+            return run_paused_on_open_circuit(f"9.b{b}", import_exported_objects, b, list_object, export_to_import_path,
+                                              map_exported, im_ic_client, dict())
+        except Exception:
+            batch_failed.set()
+            raise
+        finally:
+            list_import_done[b - 1].set()
+            set_log_context(b, [])
+
+    map_imported = dict()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="worker")
+    try:
+        list_future = [executor.submit(run_batch, b, list_object) for b, list_object in enumerate(list_batch, start=1)]
+        for future in list_future:
+            map_imported.update(future.result())
+    finally:
+        # error: batches not started yet are cancelled, running batches are finished
+        executor.shutdown(wait=True, cancel_futures=True)
+    return map_imported
+
 #########################################################################################  
 
 
@@ -308,49 +860,58 @@ if __name__ == "__main__":
                     MODULE_FOLDER: {MODULE_FOLDER} | IMPORT_CONFLICT_RESOLUTION: {IMPORT_CONFLICT_RESOLUTION} \n \
                     LOG_MODULE_FOLDER: {LOG_MODULE_FOLDER} | LOG_CI_CD_SESSION_FILE_PATH: {LOG_CI_CD_SESSION_FILE_PATH}")
 
+    http_cassette = None
+    if HTTP_CASSETTE_MODE:
+        http_cassette = HttpCassette(HTTP_CASSETTE_MODE, f"{HTTP_CASSETTE_FOLDER}/{MODULE_NAME}.jsonl", HTTP_CASSETTE_SPEED)
+
+    ex_circuit_breaker = CircuitBreaker("EXPORT", CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_OPEN_SEC)
+    im_circuit_breaker = CircuitBreaker("IMPORT", CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_OPEN_SEC)
+    ex_rate_limiter = SharedRateLimiter("EXPORT", RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST, RATE_LIMIT_QUOTA_FOLDER, EX_IC_SERVER_URL)
+    im_rate_limiter = SharedRateLimiter("IMPORT", RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST, RATE_LIMIT_QUOTA_FOLDER, IM_IC_SERVER_URL)
+    ex_ic_client = IcClient("EXPORT", EX_IC_SERVER_URL, EX_IC_SESSION_ID, token_cache_path=EX_IC_TOKEN_CACHE_PATH,
+                            pool_maxsize=max(10, EXPORT_IMPORT_CONCURRENCY), rate_limiter=ex_rate_limiter, circuit_breaker=ex_circuit_breaker, http2=HTTP2_TRANSPORT,
+                            cassette=http_cassette, sidecar_url=EX_IC_SIDECAR_URL)
+    im_ic_client = IcClient("IMPORT", IM_IC_SERVER_URL, IM_IC_SESSION_ID, token_cache_path=IM_IC_TOKEN_CACHE_PATH,
+                            pool_maxsize=max(10, EXPORT_IMPORT_CONCURRENCY), rate_limiter=im_rate_limiter, circuit_breaker=im_circuit_breaker, http2=HTTP2_TRANSPORT,
+                            cassette=http_cassette, sidecar_url=IM_IC_SIDECAR_URL)
+
+    # Open connections of both environments in background while the ci_cd task is read and resolved
+    warm_up_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="warm_up")
+    warm_up_executor.submit(ex_ic_client.warm_up, CATALOG_MAX_WORKERS)
+    warm_up_executor.submit(im_ic_client.warm_up, 2)
+    warm_up_executor.shutdown(wait=False)
+
     # === 2. Get list of objects to export ===
     adapterLogger.info("\n=== 2. Get list of objects to export ===")
     list_object_to_export = get_object_list_to_export(CI_CD_TASK_PATH)
 
     # === 7. Create cdi_objects collection ===
     adapterLogger.info("\n=== 3. Create cdi_objects collection ===")
-    cdi_cai_object_collection = dict()
-
-    adapterLogger.info("(3) add Mappings")
-    mapping_list = get_all_objects_by_type(EX_IC_SERVER_URL, EX_IC_SESSION_ID, 'Mapping')
-    mapping_collection = create_object_collection(mapping_list)
-    cdi_cai_object_collection.update(mapping_collection)
-
-    adapterLogger.info("(3) add Mapping Tasks")
-    mt_list = get_all_objects_by_type(EX_IC_SERVER_URL, EX_IC_SESSION_ID, 'MTT')
-    mt_collection = create_object_collection(mt_list)
-    cdi_cai_object_collection.update(mt_collection)
-
-    adapterLogger.info("(3) add TaskFlows")
-    tf_list = get_all_objects_by_type(EX_IC_SERVER_URL, EX_IC_SESSION_ID, 'TASKFLOW')
-    tf_collection = create_object_collection(tf_list)
-    cdi_cai_object_collection.update(tf_collection)
-
-    adapterLogger.info("(3) add ServiceConnectors")
-    sc_list = get_all_objects_by_type(EX_IC_SERVER_URL, EX_IC_SESSION_ID, 'AI_SERVICE_CONNECTOR')
-    sc_collection = create_object_collection(sc_list)
-    cdi_cai_object_collection.update(sc_collection)
-
-    adapterLogger.info("(3) add Processes")
-    pr_list = get_all_objects_by_type(EX_IC_SERVER_URL, EX_IC_SESSION_ID, 'PROCESS')
-    pr_collection = create_object_collection(pr_list)
-    cdi_cai_object_collection.update(pr_collection)
-
-    adapterLogger.info("(3) add AppConnectors")
-    ac_list = get_all_objects_by_type(EX_IC_SERVER_URL, EX_IC_SESSION_ID, 'AI_CONNECTION')
-    ac_collection = create_object_collection(ac_list)
-    cdi_cai_object_collection.update(ac_collection)
+    list_object_path = [get_object_path(row) for row in list_object_to_export]
+    list_location = sorted({get_object_location(row) for row in list_object_to_export})
+    list_targeted_query = get_targeted_queries(list_object_to_export)
+    n_targeted_queries = len(list_targeted_query)
+    adapterLogger.info(f"(3) locations in ci_cd_task: {len(list_location)} | targeted queries: {n_targeted_queries} | threshold: {TARGETED_RESOLUTION_MAX_QUERIES}")
 
+    cdi_cai_object_collection = dict()
+    if n_targeted_queries <= TARGETED_RESOLUTION_MAX_QUERIES:
+        adapterLogger.info("(3) resolve objects by types and locations from ci_cd_task")
+        cdi_cai_object_collection = create_object_collection_by_locations(ex_ic_client, list_targeted_query)
+
+    if any(obj_path not in cdi_cai_object_collection for obj_path in list_object_path):
+        adapterLogger.info("(3) resolve objects by full catalog")
+        ex_catalog_cache = None
+        if http_cassette is None:
+            # with a cassette the catalog is always read from the API, so record and replay send the same queries
+            ex_catalog_cache = ObjectCatalogCache(CATALOG_CACHE_FOLDER, EX_IC_ORG_ID or "EXPORT", CATALOG_CACHE_TTL_SEC,
+                                                  lambda type, extra_query: get_all_objects_by_type(ex_ic_client, type, extra_query))
+        cdi_cai_object_collection = create_object_collection_by_types(ex_ic_client, CDI_CAI_OBJECT_TYPES, catalog_cache=ex_catalog_cache)
+    adapterLogger.info(f"(3) cdi_cai_object_collection size: {len(cdi_cai_object_collection)}")
 
     adapterLogger.info("\n=== 4. Search id for objects ====")
     map_object_to_export = dict()
     for row in list_object_to_export:
-        obj_path = f"{row[2]}/{row[3]}"
+        obj_path = get_object_path(row)
         obj_id = cdi_cai_object_collection.get(obj_path, 'not found')
         map_object_to_export[obj_path] = (row[3], obj_id)
     adapterLogger.info(f"(4) map_object_to_export: \n{map_object_to_export}")
@@ -362,101 +923,37 @@ if __name__ == "__main__":
 
     # === 5. Run Export Job for each object ===
     adapterLogger.info("\n=== 5. Run Export - Import Job for each object ===")
-    export_session_folder = f"{EXPORT_FOLDER}/{CI_CD_SESSION_ID}"
-    log_export_folder_session = f"{LOG_EXPORT_FOLDER}/{CI_CD_SESSION_ID}"
-    log_import_folder_session = f"{LOG_IMPORT_FOLDER}/{CI_CD_SESSION_ID}"
-
-    # Exporting
-    k = 0
-    for ic_object_path, ic_object_metadata in map_object_to_export.items():
-        k += 1
-        ic_object_name = ic_object_metadata[0]
-        ic_object_id = ic_object_metadata[1]
-        adapterLogger.info(f"\n(5.{k}) >> ic_object_path: {ic_object_path} | ic_object_name: {ic_object_name} | ic_object_id: {ic_object_id}")
-
-        export_job_name = f"{ic_object_name}-{CI_CD_SESSION_ID}"
-        adapterLogger.info(f"\n(5.{k}) >> export_job_name: {export_job_name}")
-        ic_export_job_id = create_export_job(EX_IC_SERVER_URL, EX_IC_SESSION_ID, export_job_name, ic_object_id)
-        adapterLogger.info(f"(5.{k}) >> ic_export_job_id: {ic_export_job_id}")
-        time.sleep(3)
-
-        # === 6. Checking Export Job status ===
-        adapterLogger.info(f"\n===  6.{k} Checking Export Job status ===")
-        # X checks with pause in N sec
-        n_attempts = 11
-        pause_sec = 3
-        ic_export_job_status = ""
-        for i in range(1, n_attempts):
-            ic_export_job_status = check_export_job_status(EX_IC_SERVER_URL, EX_IC_SESSION_ID, ic_export_job_id)
-            adapterLogger.info(f"(6.{k}) >> [{i}] check ic_export_job_status: {ic_export_job_status}")
-            if ic_export_job_status == "SUCCESSFUL":
-                break
-            time.sleep(pause_sec)
-
-        export_file = f"{ic_object_name}-{CI_CD_SESSION_ID}.zip"
-        export_folder = export_session_folder
-        export_to_import_path = f"{export_folder}/{export_file}"
-        if ic_export_job_status == "SUCCESSFUL":
-            # === 7. Load Export Package ===
-            adapterLogger.info(f"\n===  7.{k} Load Export Package ===")
-            status = load_export_package(EX_IC_SERVER_URL, EX_IC_SESSION_ID, ic_export_job_id, export_to_import_path)
-            if status == 1:
-                adapterLogger.info(f"(7.{k}) -=[~+~] Package exported successfully [~+~]=-")
-            else:
-                adapterLogger.error(f"(7.{k}) >> Some error occurred during export... ")  
-        else:
-            adapterLogger.warning(" (7.{k}) >> Please check Export Job status later or repeat it...")
 
-        # === 8. Load Export Package ===
-        adapterLogger.info(f"\n===  8.{k} Load Export Package Log ===")
-        log_export_file = f"ex_{ic_object_name}-{CI_CD_SESSION_ID}.txt"
-        status = load_export_log(EX_IC_SERVER_URL, EX_IC_SESSION_ID, ic_export_job_id, log_export_folder_session, log_export_file)
-        if status == 1:
-            adapterLogger.info(f"(8.{k}) [+] Export log saved")
-        else:
-            adapterLogger.error(f"(8.{k}) >> Some error occurred during log saving ... ")
-
-        adapterLogger.info("==========================================================")
-
-        # === 9. Upload Import Package === 
-        adapterLogger.info("\n=== 9. Upload Import Package === ")
-        ic_import_job_id = upload_import_package(IM_IC_SERVER_URL, IM_IC_SESSION_ID, export_to_import_path)
-        adapterLogger.info(f"(9.{k}) ic_import_job_id: {ic_import_job_id}")
-        if ic_import_job_id == 0:
-            raise Exception(f"(9.{k}) [Error]: ic_import_job_id is invalid, please check logs")
-
-        # === 10. Create Import Job ===
-        adapterLogger.info("\n=== 10. Create Import Job ===")
-        import_job_name = export_job_name
-        list_object_id = [ic_object_id]
-
-        ic_import_job_status = create_import_job(IM_IC_SERVER_URL, IM_IC_SESSION_ID, ic_import_job_id, import_job_name, list_object_id, IMPORT_CONFLICT_RESOLUTION)
-        adapterLogger.info(f"(10) ic_import_job_status: {ic_import_job_status}")
-        time.sleep(3)
-        
-        # === 11. Checking Import Job status ===
-        adapterLogger.info(f"\n=== 11.{k} Checking Import Job status ===")
-        # X checks with pause in N sec
-        n_attempts = 15
-        pause_sec = 3
-        ic_import_job_status = ""
-        for i in range(1, n_attempts):
-            ic_import_job_status = check_export_job_status(IM_IC_SERVER_URL, IM_IC_SESSION_ID, ic_export_job_id)
-            adapterLogger.info(f"(11.{k}) >> [{i}] check ic_import_job_status: {ic_import_job_status}")
-            if ic_import_job_status == "SUCCESSFUL":
-                break
-            time.sleep(pause_sec)
-        
-        if ic_import_job_status == "SUCCESSFUL":
-            # === 12. Load Import  Log  ===
-            adapterLogger.info(f"\n=== 12.{k} Load Import  Log ===")
-            log_import_file = f"im_{ic_object_name}-{CI_CD_SESSION_ID}.txt"
-            status = load_import_log(IM_IC_SERVER_URL, IM_IC_SESSION_ID, ic_import_job_id, log_import_folder_session, log_import_file)
-            if status == 1:
-                adapterLogger.info(f"(12.{k}) [+] Import log saved")
-            else:
-                adapterLogger.error(f"(12.{k}) >> Some error occurred during log saving ... ") 
-        else:
-            adapterLogger.warning(" (12.{k}) >> Please check Import Job status later or repeat it...")
-        
+    # Exporting: objects (k, ic_object_path, ic_object_name, ic_object_id) in batches of EXPORT_BATCH_SIZE
+    list_object = [(k, ic_object_path, ic_object_metadata[0], ic_object_metadata[1])
+                   for k, (ic_object_path, ic_object_metadata) in enumerate(map_object_to_export.items(), start=1)]
+    list_batch = [list_object[i:i + EXPORT_BATCH_SIZE] for i in range(0, len(list_object), EXPORT_BATCH_SIZE)]
+    list_object_name = [obj[2] for obj in list_object]
+    DUPLICATE_OBJECT_NAMES.update(name for name in list_object_name if list_object_name.count(name) > 1)
+    adapterLogger.info(f"(5) objects: {len(list_object)} | export batches: {len(list_batch)} | EXPORT_BATCH_SIZE: {EXPORT_BATCH_SIZE} | EXPORT_IMPORT_CONCURRENCY: {EXPORT_IMPORT_CONCURRENCY}")
+    map_imported = dict()
+    if EXPORT_IMPORT_CONCURRENCY > 1:
+        map_imported = run_worker_pool(list_batch, ex_ic_client, im_ic_client, EXPORT_IMPORT_CONCURRENCY)
+    elif PIPELINE_EXPORT_IMPORT:
+        map_imported = run_pipeline(list_batch, ex_ic_client, im_ic_client)
+    else:
+        for b, list_batch_object in enumerate(list_batch, start=1):
+            map_imported.update(process_batch(b, list_batch_object, ex_ic_client, im_ic_client))
+    set_log_context(0, [])
+    adapterLogger.info(f"(5) objects imported: {sum(map_imported.values())}/{len(list_object)}")
+
+    job_status_poller.stop()
+    ex_ic_client.close()
+    im_ic_client.close()
+    adapterLogger.info(f"Job status poller: {job_status_poller.get_stats()}")
+    adapterLogger.info(f"Rate limiter EXPORT: {ex_rate_limiter.get_stats()}")
+    adapterLogger.info(f"Rate limiter IMPORT: {im_rate_limiter.get_stats()}")
+    adapterLogger.info(f"Retries EXPORT: {ex_ic_client.retry_stats.get_stats()}")
+    adapterLogger.info(f"Retries IMPORT: {im_ic_client.retry_stats.get_stats()}")
+    for ic_client in (ex_ic_client, im_ic_client):
+        for endpoint, transfer_stats in ic_client.transfer_stats.get_stats().items():
+            adapterLogger.info(f"Transfer {ic_client.env_name} {endpoint}: {transfer_stats}")
+    if http_cassette is not None:
+        http_cassette.close()
+        adapterLogger.info(f"HTTP cassette: {http_cassette.get_stats()}")
     adapterLogger.info(f"\n=== Export and Import is finished | CI_CD_SESSION_ID: {CI_CD_SESSION_ID} ===")